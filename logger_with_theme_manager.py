@@ -1,9 +1,17 @@
 import logging
+import threading
 import tkinter as tk
 from tkinter import ttk, Menu, filedialog, messagebox
 from datetime import datetime
 import json
 import os
+import sys
+import time
+import heapq
+import bisect
+from array import array
+from collections import deque
+from functools import lru_cache
 CONFIG_FILE = "logger_config.json"
 class ToolTip:
     """Minimal tooltip that follows theme colors."""
@@ -195,13 +203,22 @@ class ThemeManager:
         """Expose current theme colors to others (e.g., ToolTip)."""
         return self.THEMES[self.current]
 class TTKLogger(logging.Handler):
-    def __init__(self, treeview: ttk.Treeview, level=logging.INFO, autoscroll=True, on_emit=None):
+    """Thread-safe handler: emit() only buffers; the Tk thread drains the buffer in batches."""
+    MAX_BUFFER = 10000  # records waiting for the UI; beyond this new records are dropped and counted
+    MAX_BATCH = 500     # records inserted per drain
+    DRAIN_MS = 50
+    def __init__(self, treeview: ttk.Treeview, level=logging.INFO, autoscroll=True, on_emit=None, on_dropped=None):
         super().__init__(level)
         self.treeview = treeview
         self.autoscroll = autoscroll
         self.on_emit = on_emit
+        self.on_dropped = on_dropped  # called on the Tk thread with the running total of dropped records
+        self.buffer = deque()  # append/popleft are atomic, so emitting threads never take a Tk or UI lock
+        self.dropped = 0
+        self._reported_dropped = 0
         self._setup_treeview()
         self._setup_tags()
+        self._drain_id = self.treeview.after(self.DRAIN_MS, self._drain)
     def _setup_treeview(self):
         self.treeview["columns"] = ("time", "level", "message")
         self.treeview.heading("#0", text="")
@@ -219,25 +236,302 @@ class TTKLogger(logging.Handler):
         self.treeview.tag_configure("DEBUG", foreground="#9e9e9e")
     def emit(self, record):
         try:
-            msg = self.format(record)
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            iid = self.treeview.insert("", "end", values=(ts, record.levelname, msg), tags=(record.levelname,))
-            if self.autoscroll:
-                self.treeview.yview_moveto(1.0)
-            if self.on_emit:
-                self.on_emit(iid, {"time": ts, "level": record.levelname, "message": msg})
+            if len(self.buffer) >= self.MAX_BUFFER:
+                self.dropped += 1
+                return
+            # Raw fields only; the timestamp is formatted when the row is displayed
+            self.buffer.append((record.created, record.levelname, record.name, self.format(record)))
         except Exception:
             self.handleError(record)
+    def _drain(self):
+        """Runs on the Tk thread: inserts up to MAX_BATCH buffered records, then reschedules."""
+        inserted = 0
+        try:
+            while self.buffer and inserted < self.MAX_BATCH:
+                rec = self.buffer.popleft()
+                created, level, _, message = rec
+                iid = self.treeview.insert("", "end", values=(format_time(created), level, message), tags=(level,))
+                inserted += 1
+                if self.on_emit:
+                    self.on_emit(iid, rec)
+            if inserted and self.autoscroll:
+                self.treeview.yview_moveto(1.0)
+            if self.dropped != self._reported_dropped and self.on_dropped:
+                self._reported_dropped = self.dropped
+                self.on_dropped(self.dropped)
+        finally:
+            # Straight back in when a backlog remains, otherwise wait for the next frame
+            self._drain_id = self.treeview.after(1 if self.buffer else self.DRAIN_MS, self._drain)
+    def close(self):
+        if self._drain_id:
+            try:
+                self.treeview.after_cancel(self._drain_id)
+            except Exception:
+                pass  # widget already destroyed
+            self._drain_id = None
+        super().close()
+@lru_cache(maxsize=4096)
+def _format_second(second):
+    return datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+def format_time(created):
+    """Display timestamp for a record's created time; cached per second, since bursts share it."""
+    return _format_second(int(created))
+class LogStore:
+    """Columnar in-memory log records with an incremental trigram index and exact level and minute indexes."""
+    CHECK_EVERY = 20000  # candidates verified between cancellation checks
+    ROW_BYTES = 8 + 1 + 4 + 4 + 8 + 8 + 8  # time, level, logger, minute, arena ends, iid slot
+    LIST_BYTES = sys.getsizeof(array("I")) + 24  # empty posting list plus its dict slot
+    def __init__(self):
+        # Row-aligned columns holding rows offset..end-1. Rows are numbered for the whole session;
+        # new ones are appended with the iid last, so a reader holding an end row always sees complete
+        # rows. evict() drops from the front and must not run while a search thread is reading.
+        self.offset = 0
+        self.ids = []
+        self.times = array("d")  # record.created
+        self.level_col = array("B")
+        self.logger_col = array("I")
+        self.minute_col = array("I")  # created // 60
+        self.arena = bytearray()  # UTF-8 messages back to back
+        self.arena_base = 0  # arena bytes already evicted
+        self.ends = array("Q")  # end of each message in the arena, counted from the session start
+        # Lowercased "time level message" lines, each ending in a newline, for verifying text matches
+        # without formatting rows; a query never contains a newline, so no match spans two rows
+        self.lower = bytearray()
+        self.lower_base = 0
+        self.lower_ends = array("Q")
+        self.level_codes = {}  # level name -> code
+        self.level_names = []  # code -> level name
+        self.logger_codes = {}  # interned logger names
+        self.logger_names = []
+        self.grams = {}  # trigram -> ascending rows
+        self.level_rows = []  # level code -> ascending rows
+        self.minute_rows = {}  # minute -> ascending rows
+        self.nbytes = 0  # record data held in the columns and arena, excluding the indexes
+        self.index_bytes = 0  # estimated size of the indexes, kept up to date by add() and evict()
+    def __len__(self):
+        return len(self.ids)
+    @property
+    def end(self):
+        return self.offset + len(self.ids)
+    def iid(self, row):
+        return self.ids[row - self.offset]
+    def message(self, row):
+        i = row - self.offset
+        start = self.ends[i - 1] if i else self.arena_base
+        return self.arena[start - self.arena_base:self.ends[i] - self.arena_base].decode("utf-8")
+    def line(self, row):
+        """Formats a row the way it is displayed and searched: "time level message"."""
+        i = row - self.offset
+        return f"{format_time(self.times[i])} {self.level_names[self.level_col[i]]} {self.message(row)}"
+    @staticmethod
+    def _code(codes, names, name):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+    def add(self, iid, rec):
+        """Appends a (created, level, logger name, message) record and indexes it; returns its row."""
+        created, level, name, message = rec
+        row = self.end
+        text = f"{format_time(created)} {level} {message}".lower()
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        for g in grams:
+            rows = self.grams.get(g)
+            if rows is None:
+                rows = self.grams[g] = array("I")
+                self.index_bytes += self.LIST_BYTES + sys.getsizeof(g)
+            rows.append(row)
+        code = self._code(self.level_codes, self.level_names, level)
+        if code == len(self.level_rows):
+            self.level_rows.append(array("I"))
+            self.index_bytes += self.LIST_BYTES
+        self.level_rows[code].append(row)
+        minute = int(created // 60)
+        rows = self.minute_rows.get(minute)
+        if rows is None:
+            rows = self.minute_rows[minute] = array("I")
+            self.index_bytes += self.LIST_BYTES + sys.getsizeof(minute)
+        rows.append(row)
+        self.index_bytes += 4 * (len(grams) + 2)
+        data = message.encode("utf-8")
+        self.arena += data
+        self.ends.append(self.arena_base + len(self.arena))
+        lower = text.encode("utf-8") + b"\n"
+        self.lower += lower
+        self.lower_ends.append(self.lower_base + len(self.lower))
+        self.times.append(created)
+        self.level_col.append(code)
+        self.logger_col.append(self._code(self.logger_codes, self.logger_names, name))
+        self.minute_col.append(minute)
+        self.nbytes += self.ROW_BYTES + len(data) + len(lower) + sys.getsizeof(iid)
+        self.ids.append(iid)
+        return row
+    @staticmethod
+    def parse(query):
+        """Splits a lowercased query into free text, `level:a,b` names and `time:` fragments."""
+        words, levels, times = [], None, []
+        for tok in query.split():
+            if tok.startswith("level:") and len(tok) > 6:
+                levels = (levels or set()) | {name.upper() for name in tok[6:].split(",") if name}
+            elif tok.startswith("time:") and len(tok) > 5:
+                times.append(tok[5:].replace("t", " "))  # allow 2024-05-01T12:30
+            else:
+                words.append(tok)
+        return " ".join(words), levels, times
+    def _filters(self, levels, times):
+        codes = None if levels is None else {self.level_codes[name] for name in levels if name in self.level_codes}
+        minutes = None
+        if times:
+            minutes = {m for m in list(self.minute_rows) if all(t in format_time(m * 60)[:16] for t in times)}
+        return codes, minutes
+    def search(self, query, n=None, cancelled=None):
+        """Ascending matching rows below n, or None if cancelled() turned true."""
+        n = self.end if n is None else n
+        offset = self.offset
+        text, levels, times = self.parse(query)
+        codes, minutes = self._filters(levels, times)
+        # Candidate sources as (size, row lists); only the smallest one is walked
+        sources = []
+        if len(text) >= 3:
+            grams = [self.grams.get(text[i:i + 3]) for i in range(len(text) - 2)]
+            if any(rows is None for rows in grams):
+                return []
+            smallest = min(grams, key=len)
+            sources.append((len(smallest), [smallest]))
+        if codes is not None:
+            lists = [self.level_rows[c] for c in codes]
+            sources.append((sum(map(len, lists)), lists))
+        if minutes is not None:
+            lists = [self.minute_rows[m] for m in minutes]
+            sources.append((sum(map(len, lists)), lists))
+        if sources:
+            lists = min(sources, key=lambda s: s[0])[1]
+            candidates = lists[0] if len(lists) == 1 else heapq.merge(*lists)
+        elif text:
+            return self._scan(text.encode("utf-8"), n, cancelled)
+        else:
+            candidates = range(offset, n)
+        needle = text.encode("utf-8")
+        hits = []
+        for i, row in enumerate(candidates):
+            if row >= n:
+                break
+            if cancelled and i % self.CHECK_EVERY == 0 and cancelled():
+                return None
+            if codes is not None and self.level_col[row - offset] not in codes:
+                continue
+            if minutes is not None and self.minute_col[row - offset] not in minutes:
+                continue
+            if needle and not self._contains(row, needle):
+                continue
+            hits.append(row)
+        return hits
+    def _contains(self, row, needle):
+        i = row - self.offset
+        start = self.lower_ends[i - 1] if i else self.lower_base
+        return self.lower.find(needle, start - self.lower_base, self.lower_ends[i] - self.lower_base) != -1
+    def _scan(self, needle, n, cancelled):
+        """Rows below n containing needle when no index narrows the search: one pass over the lowercase arena."""
+        base, ends, offset = self.lower_base, self.lower_ends, self.offset
+        stop = ends[n - offset - 1] - base if n > offset else 0
+        hits = []
+        pos = self.lower.find(needle, 0, stop)
+        while pos != -1:
+            i = bisect.bisect_right(ends, base + pos)
+            hits.append(offset + i)
+            if cancelled and len(hits) % self.CHECK_EVERY == 0 and cancelled():
+                return None
+            pos = self.lower.find(needle, ends[i] - base, stop)  # next row
+        return hits
+    def matches(self, row, parsed):
+        """Checks one row against a parse() result without touching the indexes, for newly added records."""
+        text, levels, times = parsed
+        i = row - self.offset
+        return ((levels is None or self.level_names[self.level_col[i]] in levels)
+                and all(t in format_time(self.times[i])[:16] for t in times)
+                and (not text or self._contains(row, text.encode("utf-8"))))
+    def bytes_to_free(self, nbytes):
+        """How many of the oldest rows hold at least nbytes, counting their share of the indexes."""
+        # Index memory is charged to rows in proportion to their record data
+        nbytes = nbytes * self.nbytes / (self.nbytes + self.index_bytes) if self.nbytes else 0
+        count = freed = 0
+        start, lower_start = self.arena_base, self.lower_base
+        for i, iid in enumerate(self.ids):
+            if freed >= nbytes:
+                break
+            freed += self.ROW_BYTES + self.ends[i] - start + self.lower_ends[i] - lower_start + sys.getsizeof(iid)
+            start, lower_start = self.ends[i], self.lower_ends[i]
+            count += 1
+        return count
+    def evict(self, count):
+        """Drops the oldest count rows from the columns and every posting list; returns their iids."""
+        if not count:
+            return []
+        first = self.offset + count
+        evicted = self.ids[:count]
+        arena_end = self.ends[count - 1]
+        freed = arena_end - self.arena_base
+        lower_end = self.lower_ends[count - 1]
+        lower_freed = lower_end - self.lower_base
+        del self.ids[:count], self.times[:count], self.level_col[:count], self.logger_col[:count]
+        del self.minute_col[:count], self.ends[:count], self.arena[:freed]
+        del self.lower_ends[:count], self.lower[:lower_freed]
+        self.arena_base = arena_end
+        self.lower_base = lower_end
+        self.offset = first
+        self.nbytes -= self.ROW_BYTES * count + freed + lower_freed + sum(map(sys.getsizeof, evicted))
+        postings = 0
+        for g, rows in list(self.grams.items()):
+            k = bisect.bisect_left(rows, first)
+            postings += k
+            if k == len(rows):
+                del self.grams[g]
+                self.index_bytes -= self.LIST_BYTES + sys.getsizeof(g)
+            elif k:
+                del rows[:k]
+        for rows in self.level_rows:
+            k = bisect.bisect_left(rows, first)
+            postings += k
+            del rows[:k]
+        for minute, rows in list(self.minute_rows.items()):
+            k = bisect.bisect_left(rows, first)
+            postings += k
+            del rows[:k]
+            if not rows:
+                del self.minute_rows[minute]
+                self.index_bytes -= self.LIST_BYTES + sys.getsizeof(minute)
+        self.index_bytes -= 4 * postings
+        return evicted
+    def memory_bytes(self):
+        """Approximate footprint of the index structures, excluding the records themselves."""
+        size = sum(map(sys.getsizeof, (self.grams, self.minute_rows, self.level_rows)))
+        size += sum(sys.getsizeof(g) + sys.getsizeof(rows) for g, rows in list(self.grams.items()))
+        size += sum(map(sys.getsizeof, self.level_rows)) + sum(map(sys.getsizeof, list(self.minute_rows.values())))
+        return size
 class LoggerApp(tk.Tk):
     PADX = 12
     PADY = 8
+    SEARCH_DEBOUNCE_MS = 250
+    MAX_RECORDS = 200000  # records kept in memory by default; 0 means no limit
+    MAX_MB = 256
+    EVICT_TO = 0.9  # eviction trims to this fraction of the limit, so it runs in batches
+    HISTORY_PAGE_LINES = 5000  # log file lines per History… page
     def __init__(self):
         super().__init__()
         self.title("TTK Logger — Professional Theme & UI")
         self.geometry("960x620")
         self.minsize(800, 500)
-        self.all_items = {}
         self.detached_items = set()
+        self.active_query = ""  # lowercased query the current view was filtered with
+        self.active_filter = LogStore.parse("")
+        self.store = LogStore()
+        self.search_gen = 0  # bumped per search; background scans for an older one give up
+        self.searches_running = 0  # eviction waits while a search thread reads the index
+        self.max_records = self.MAX_RECORDS
+        self.max_bytes = self.MAX_MB * 1024 * 1024
+        self.evicted_total = 0
+        self._search_id = None
         self.theme = ThemeManager(self)
         main = ttk.Frame(self, padding=0)
         main.pack(fill="both", expand=True)
@@ -249,8 +543,8 @@ class LoggerApp(tk.Tk):
         self.search_var = tk.StringVar()
         entry = ttk.Entry(search_frame, textvariable=self.search_var, width=38, font=("Segoe UI", 10))
         entry.pack(side="left", padx=(6, 4))
-        entry.bind("<KeyRelease>", lambda e: self._apply_filter())
-        ttk.Button(search_frame, text="Go", width=5, command=self._apply_filter).pack(side="left", padx=2)
+        entry.bind("<KeyRelease>", lambda e: self._schedule_search())
+        ttk.Button(search_frame, text="Go", width=5, command=lambda: self._apply_filter(force=True)).pack(side="left", padx=2)
         ttk.Button(search_frame, text="Clear", width=6, command=self._reset_filter).pack(side="left", padx=2)
         btn_frame = ttk.Frame(top_bar)
         btn_frame.pack(side="right")
@@ -259,6 +553,8 @@ class LoggerApp(tk.Tk):
             ("Warn", lambda: self.logger.warning("Warning message")),
             ("Error", lambda: self.logger.error("Error message")),
             ("Debug", lambda: self.logger.debug("Debug details")),
+            ("Burst", self._log_burst),
+            ("History…", self._open_full_history),
             ("Clear", self._clear_logs)
         ]:
             b = ttk.Button(btn_frame, text=text, width=7, command=cmd)
@@ -289,7 +585,7 @@ class LoggerApp(tk.Tk):
         self._setup_settings(settings_frame)
         self.logger = logging.getLogger("TTKLogger")
         self.logger.setLevel(logging.DEBUG)
-        self.handler = TTKLogger(self.tree, on_emit=self._on_emit_record)
+        self.handler = TTKLogger(self.tree, on_emit=self._on_emit_record, on_dropped=self._on_dropped)
         self.handler.setFormatter(logging.Formatter("%(message)s"))
         self.logger.addHandler(self.handler)
         self.file_handler = logging.FileHandler("app.log", mode="a")
@@ -369,6 +665,22 @@ class LoggerApp(tk.Tk):
         help_btn2.grid(row=r, column=3, sticky="e", pady=(0, 4))
         ToolTip(help_btn2, self.theme.palette,
                 "When enabled, the view jumps to the newest log entry automatically.")
+        r += 1
+        ttk.Label(f, text="Keep in Memory:", font=("Segoe UI", 10, "bold")).grid(row=r, column=0, sticky="w", pady=(4, 0))
+        limits = ttk.Frame(f)
+        limits.grid(row=r, column=1, sticky="w", padx=(10, 0), pady=(4, 0))
+        self.max_records_var = tk.IntVar(value=self.MAX_RECORDS)
+        self.max_mb_var = tk.IntVar(value=self.MAX_MB)
+        ttk.Spinbox(limits, textvariable=self.max_records_var, from_=0, to=10000000, increment=10000, width=10).pack(side="left")
+        ttk.Label(limits, text="records or").pack(side="left", padx=6)
+        ttk.Spinbox(limits, textvariable=self.max_mb_var, from_=0, to=65536, increment=64, width=7).pack(side="left")
+        ttk.Label(limits, text="MB").pack(side="left", padx=(6, 0))
+        ttk.Button(f, text="Apply", command=self._apply_limits).grid(row=r, column=2, sticky="e", padx=(8, 0), pady=(4, 0))
+        help_btn3 = ttk.Button(f, text="?", width=2)
+        help_btn3.grid(row=r, column=3, sticky="e", pady=(4, 0))
+        ToolTip(help_btn3, self.theme.palette,
+                "Once either limit is reached the oldest records are dropped from the view (0 = no limit).\n"
+                "The log file keeps everything; open it with History….")
     def _build_files_group(self, frame):
         f = frame
         for col, w in [(0, 0), (1, 1), (2, 0), (3, 0)]:
@@ -406,6 +718,15 @@ class LoggerApp(tk.Tk):
     def _toggle_autoscroll(self):
         self.handler.autoscroll = self.autoscroll_var.get()
         self._set_status(f"Autoscroll → {self.handler.autoscroll}")
+    def _apply_limits(self):
+        try:
+            records, mb = int(self.max_records_var.get()), int(self.max_mb_var.get())
+        except (tk.TclError, ValueError):
+            self._set_status("⚠ Memory limits must be whole numbers")
+            return
+        self.max_records, self.max_bytes = max(records, 0), max(mb, 0) * 1024 * 1024
+        self._enforce_capacity()
+        self._set_status(f"Memory limit → {records or '∞'} records / {mb or '∞'} MB")
     def _choose_file(self):
         path = filedialog.asksaveasfilename(
             defaultextension=".log",
@@ -430,7 +751,8 @@ class LoggerApp(tk.Tk):
         self._restyle_context_menu()
         self._set_status(f"Theme → {self.theme.THEMES[theme]['name']}")
     def _load_settings(self):
-        defaults = {"level": "DEBUG", "autoscroll": True, "file_path": "app.log", "theme": "light"}
+        defaults = {"level": "DEBUG", "autoscroll": True, "file_path": "app.log", "theme": "light",
+                    "max_records": self.MAX_RECORDS, "max_mb": self.MAX_MB}
         if os.path.exists(CONFIG_FILE):
             try:
                 with open(CONFIG_FILE, "r", encoding="utf-8") as f:
@@ -442,6 +764,9 @@ class LoggerApp(tk.Tk):
         self.autoscroll_var.set(defaults["autoscroll"])
         self.file_path_var.set(defaults["file_path"])
         self.theme_var.set(defaults["theme"])
+        self.max_records_var.set(defaults["max_records"])
+        self.max_mb_var.set(defaults["max_mb"])
+        self._apply_limits()
         self._change_log_level(defaults["level"])
         self.handler.autoscroll = defaults["autoscroll"]
         self._set_file_handler_path(defaults["file_path"])
@@ -453,6 +778,8 @@ class LoggerApp(tk.Tk):
             "autoscroll": self.autoscroll_var.get(),
             "file_path": self.file_path_var.get(),
             "theme": self.theme_var.get(),
+            "max_records": self.max_records,
+            "max_mb": self.max_bytes // (1024 * 1024),
         }
         try:
             with open(CONFIG_FILE, "w", encoding="utf-8") as f:
@@ -461,36 +788,174 @@ class LoggerApp(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error", f"Save failed: {e}")
     def _on_emit_record(self, iid, rec):
-        self.all_items[iid] = rec
-        self._apply_filter()
-    def _match_filter(self, rec):
+        """New records are tested once against the active query; the rest of the view is untouched."""
+        row = self.store.add(iid, rec)
+        if self.active_query and not self.store.matches(row, self.active_filter):
+            self.tree.detach(iid)
+            self.detached_items.add(iid)
+        self._enforce_capacity()
+    def _enforce_capacity(self):
+        """Evicts the oldest records from the model and the view once the count or byte limit is exceeded."""
+        used = self.store.nbytes + self.store.index_bytes  # the byte limit covers records and their indexes
+        over_count = self.max_records and len(self.store) > self.max_records
+        over_bytes = self.max_bytes and used > self.max_bytes
+        if not (over_count or over_bytes) or self.searches_running:
+            return
+        count = len(self.store) - int(self.max_records * self.EVICT_TO) if over_count else 0
+        if over_bytes:
+            count = max(count, self.store.bytes_to_free(used - int(self.max_bytes * self.EVICT_TO)))
+        evicted = self.store.evict(count)
+        self.detached_items.difference_update(evicted)
+        self.tree.delete(*evicted)
+        self.evicted_total += len(evicted)
+        self._set_status(f"Evicted {self.evicted_total:,} oldest records so far · History… shows the full log")
+    def _open_full_history(self):
+        """Pages through the log file from the end, including records evicted from memory."""
+        path = self.file_path_var.get()
+        self.file_handler.flush()
+        if not os.path.exists(path):
+            messagebox.showinfo("History", f"No log file at {path}")
+            return
+        win = tk.Toplevel(self)
+        win.title(f"History — {os.path.basename(path)}")
+        win.geometry("960x560")
+        frame = ttk.Frame(win)
+        frame.pack(fill="both", expand=True)
+        footer = ttk.Frame(frame)
+        footer.pack(fill="x", side="bottom")
+        status = tk.StringVar(value="Loading…")
+        ttk.Label(footer, textvariable=status, style="Status.TLabel", anchor="w").pack(side="left", fill="x", expand=True)
+        older_btn = ttk.Button(footer, text="Load Older", width=11)
+        older_btn.pack(side="right", padx=4, pady=2)
+        tree = ttk.Treeview(frame, columns=("time", "level", "message"), show="headings", style="Treeview")
+        for col, text, width in (("time", "Time", 170), ("level", "Level", 90), ("message", "Message", 600)):
+            tree.heading(col, text=text, anchor="w")
+            tree.column(col, width=width, anchor="w")
+        for level in ("INFO", "WARNING", "ERROR", "DEBUG"):
+            tree.tag_configure(level, foreground=self.tree.tag_configure(level, "foreground"))
+        vsb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        tree.pack(side="left", fill="both", expand=True, padx=(4, 0), pady=4)
+        vsb.pack(side="right", fill="y", pady=4)
+        # The window holds at most one memory limit's worth of lines; loading older pages
+        # drops the newest ones, so browsing a huge file stays as bounded as the live view
+        limit = self.max_records or self.MAX_RECORDS
+        start = os.path.getsize(path)  # byte offset of the oldest line shown
+        def load_older():
+            older_btn.state(["disabled"])
+            status.set("Loading…")
+            def read():
+                lines, offset = self._read_lines_before(path, start, self.HISTORY_PAGE_LINES)
+                self.after(0, show, lines, offset)
+            threading.Thread(target=read, daemon=True).start()
+        def show(lines, offset):
+            nonlocal start
+            if not win.winfo_exists():
+                return
+            start = offset
+            for i, (ts, level, msg) in enumerate(lines):
+                tree.insert("", i, values=(ts, level, msg), tags=(level,))
+            shown = tree.get_children()
+            if len(shown) > limit:
+                tree.delete(*shown[limit:])
+            tree.yview_moveto(0.0 if len(shown) > len(lines) else 1.0)
+            where = "start of file" if start == 0 else f"{start:,} older bytes"
+            status.set(f"{min(len(shown), limit):,} lines shown · {where} · {path}")
+            if start > 0:
+                older_btn.state(["!disabled"])
+        older_btn.configure(command=load_older)
+        load_older()
+    @staticmethod
+    def _read_lines_before(path, end, count, block=1 << 20):
+        """Returns up to count parsed (time, level, message) lines ending at byte offset end, and the offset they start at."""
+        start, data = end, b""
+        with open(path, "rb") as f:
+            while start > 0 and data.count(b"\n") <= count:
+                step = min(block, start)
+                start -= step
+                f.seek(start)
+                data = f.read(step) + data
+        lines = data.split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()  # trailing newline
+        if start > 0:
+            start += len(lines[0]) + 1  # partial first line; it belongs to the next page
+            lines = lines[1:]
+        for skipped in lines[:-count]:
+            start += len(skipped) + 1
+        rows = []
+        for raw in lines[-count:]:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            parts = line.split(" - ", 2)
+            rows.append(parts if len(parts) == 3 else ("", "", line))
+        return rows, start
+    def _on_dropped(self, total):
+        self._set_status(f"⚠ Dropped {total:,} records (log buffer full)")
+    def _log_burst(self, count=20000):
+        """Logs from a worker thread, to exercise the buffered handler under load."""
+        def run():
+            for i in range(count):
+                self.logger.info("Burst message %d of %d", i + 1, count)
+        threading.Thread(target=run, daemon=True).start()
+    def _schedule_search(self):
+        """Restarts the debounce timer on every keystroke."""
+        if self._search_id:
+            self.after_cancel(self._search_id)
+        self._search_id = self.after(self.SEARCH_DEBOUNCE_MS, self._apply_filter)
+    def _apply_filter(self, force=False):
+        """Full refilter, only when the query actually changed; matching runs off the Tk thread."""
+        if self._search_id:
+            self.after_cancel(self._search_id)
+            self._search_id = None
         q = self.search_var.get().strip().lower()
+        if q == self.active_query and not force:
+            return
+        self.active_query = q
+        self.active_filter = LogStore.parse(q)
+        self.search_gen += 1
         if not q:
-            return True
-        return q in f"{rec['time']} {rec['level']} {rec['message']}".lower()
-    def _apply_filter(self):
-        for iid, rec in self.all_items.items():
-            match = self._match_filter(rec)
-            parent = self.tree.parent(iid)
-            if match and iid in self.detached_items:
-                self.tree.reattach(iid, "", "end")
-                self.detached_items.remove(iid)
-            elif not match and parent != "":
-                self.tree.detach(iid)
-                self.detached_items.add(iid)
+            self._show_matches(self.search_gen, self.store, list(range(self.store.offset, self.store.end)), self.store.end, 0.0)
+            return
+        self._set_status(f"Searching {len(self.store):,} records…")
+        self.searches_running += 1
+        threading.Thread(target=self._search_worker, args=(self.search_gen, self.store, q, self.store.end),
+                         daemon=True).start()
+    def _search_worker(self, gen, store, q, n):
+        # Rows only get appended (clearing swaps in a new store), so the first n are stable to read here
+        start = time.perf_counter()
+        rows = store.search(q, n, cancelled=lambda: gen != self.search_gen)
+        self.after(0, self._search_finished, gen, store, rows, n, time.perf_counter() - start)
+    def _search_finished(self, gen, store, rows, n, elapsed):
+        self.searches_running -= 1
+        if rows is not None:
+            self._show_matches(gen, store, rows, n, elapsed)
+        self._enforce_capacity()  # catch up on eviction deferred while the search ran
+    def _show_matches(self, gen, store, rows, n, elapsed):
+        if gen != self.search_gen or store is not self.store:
+            return
+        # Records that arrived while the search ran
+        rows.extend(r for r in range(n, store.end) if store.matches(r, self.active_filter))
+        hits = [store.iid(r) for r in rows]
+        # One call rebuilds the view in log order, instead of a detach/reattach per item
+        self.tree.set_children("", *hits)
+        self.detached_items = set(store.ids).difference(hits)
         if self.handler.autoscroll:
             self.tree.yview_moveto(1.0)
+        mb = store.memory_bytes() / (1024 * 1024)
+        per_record = store.nbytes / len(store) if store else 0
+        if self.active_query:
+            self._set_status(f"{len(hits):,} of {len(store):,} records match in {elapsed * 1000:.0f} ms · index {mb:.1f} MB")
+        else:
+            self._set_status(f"{len(store):,} records · {per_record:.0f} B/record · index {mb:.1f} MB")
     def _reset_filter(self):
         self.search_var.set("")
-        for iid in list(self.detached_items):
-            self.tree.reattach(iid, "", "end")
-        self.detached_items.clear()
+        self._apply_filter()
         self._set_status("Filter cleared")
     def _clear_logs(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        self.all_items.clear()
+        self.tree.delete(*self.store.ids)
         self.detached_items.clear()
+        self.store = LogStore()
+        self.search_gen += 1
         self._set_status("Logs cleared")
     def _set_status(self, text):
         self.status_var.set(text)
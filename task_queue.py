@@ -1,5 +1,9 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, simpledialog
+    import tkinter.font as tkFont
+except ImportError:
+    tk = None # Servers without Tk can still use the command-line runner
 import queue
 import threading
 import time
@@ -7,56 +11,2212 @@ import concurrent.futures
 from datetime import datetime
 import os
 import csv
-import tkinter.font as tkFont
+import zlib
+import errno
+import shutil
+import gzip
+import lzma
+import collections
+import multiprocessing
+import hashlib
+import json
+import heapq
+import random
+import tracemalloc
+import cProfile
+import pstats
+import io
+import sqlite3
+import select
+import struct
+import ctypes
+import ctypes.util
+import sys
+import argparse
+import socket
+try:
+    import resource # Unix only; used for worker process peak RSS
+except ImportError:
+    resource = None
+try:
+    import pyarrow
+    import pyarrow.parquet
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+PIPELINE_CHUNK_SIZE = 1024 * 1024 # Read/compress granularity for pipeline mode
+COPY_CHUNK_SIZE = 8 * 1024 * 1024  # Bytes per kernel copy call between progress updates
+COPY_BUFFER_SIZE = 1024 * 1024     # Buffer for the read/write fallback copy
+COMPRESS_BLOCK_SIZE = 4 * 1024 * 1024 # Independent block size for parallel compression
+CHECKPOINT_FILE = "task_checkpoints.json"
+WATCHDOG_INTERVAL = 0.25 # Seconds between timeout checks
+HISTORY_DB = "task_history.db"
+HISTORY_PAGE_SIZE = 200  # History rows shown per page
+WATCH_SETTLE = 2.0       # Seconds a watched file's size/mtime must stay unchanged before it is queued
+WATCH_POLL_INTERVAL = 1.0 # Seconds between scans when inotify is unavailable
+WATCH_FULL_SCAN_EVERY = 30 # Polls between full rescans, which catch in-place rewrites that leave directory mtimes alone
+REMOTE_HEARTBEAT = 2.0      # Seconds between worker node heartbeats
+REMOTE_LEASE_TIMEOUT = 10.0 # A worker silent for this long is considered lost
+REMOTE_MAX_TASKS = 256      # Tasks the coordinator can have out on worker nodes at once
+STEAL_BATCH_SIZE = 16       # Most entries a work-stealing worker moves from the shared heap at once
+STEALING_MIN_WORKERS = 16   # "auto" dispatcher switches to work stealing from this many workers
+PROGRESS_STEP = 5           # Percent per progress style bucket in the task table
 
 # Custom Priority Queue with Path Mapping
-# Structure: (priority_value, task_id, file_path)
+# Structure: (priority_value, -rank, task_id, file_path)
+# rank breaks ties within a priority (e.g. critical path length of a dependency graph)
 class PriorityQueue:
     def __init__(self):
         self._queue = queue.PriorityQueue()
         self._items = {} # Maps file_path to (priority, task_id) for existence checks
 
-    def put(self, file_path, priority, task_id):
-        if file_path not in self._items:
-            # Lower number = Higher priority (standard for PriorityQueue)
-            priority_value = self._get_priority_value(priority)
-            self._queue.put((priority_value, task_id, file_path))
-            self._items[file_path] = (priority_value, task_id)
+    def put(self, file_path, priority, task_id, rank=0):
+        if file_path not in self._items:
+            # Lower number = Higher priority (standard for PriorityQueue)
+            priority_value = self._get_priority_value(priority)
+            self._queue.put((priority_value, -rank, task_id, file_path))
+            self._items[file_path] = (priority_value, task_id)
+
+    def get(self, timeout=None):
+        priority_value, _, task_id, file_path = self._queue.get(timeout=timeout)
+        if file_path in self._items:
+            del self._items[file_path]
+        return file_path
+
+    def task_done(self):
+        self._queue.task_done()
+        
+    def empty(self):
+        return self._queue.empty()
+
+    def qsize(self):
+        return self._queue.qsize()
+        
+    def contains(self, file_path):
+        return file_path in self._items
+
+    def _get_priority_value(self, priority_label):
+        # High=1, Medium=2, Low=3
+        return {"High": 1, "Medium": 2, "Low": 3}.get(priority_label, 2)
+        
+    def get_priority_label(self, priority_value):
+        # 1=High, 2=Medium, 3=Low
+        return {1: "High", 2: "Medium", 3: "Low"}.get(priority_value, "Medium")
+        
+    def get_all_paths(self):
+        return list(item[-1] for item in self._queue.queue)
+
+    def get_many(self, max_items):
+        # Pops up to max_items entries in priority order under one lock acquisition; never blocks
+        with self._queue.mutex:
+            heap = self._queue.queue
+            entries = [heapq.heappop(heap) for _ in range(min(max_items, len(heap)))]
+        for entry in entries:
+            self._items.pop(entry[-1], None)
+        return entries
+
+    def peek(self):
+        # Best entry without removing it; an unlocked read, so only a hint under concurrency
+        heap = self._queue.queue
+        return heap[0] if heap else None
+
+# Work-stealing dispatcher with the same interface as PriorityQueue, for large worker counts.
+# Each worker thread owns a deque that it refills with a priority-ordered batch from the shared
+# heap, so the shared lock is taken once per batch rather than once per task. A worker whose
+# deque and the heap are both empty steals the back half of the fullest deque. Order is
+# approximately by priority: a worker returns to the heap early whenever the heap holds
+# something better than the head of its own deque.
+class WorkStealingQueue:
+    def __init__(self, workers, batch_size=STEAL_BATCH_SIZE):
+        self._shared = PriorityQueue()
+        self._deques = [collections.deque() for _ in range(workers)]
+        self._locks = [threading.Lock() for _ in range(workers)]
+        self._held = set() # Paths sitting in worker deques, for contains()
+        self._local = threading.local()
+        self._next_index = 0
+        self._cond = threading.Condition() # Idle workers wait here for put()
+        self.batch_size = batch_size
+        self.steals = 0
+
+    def put(self, file_path, priority, task_id, rank=0):
+        with self._cond:
+            if file_path not in self._held:
+                self._shared.put(file_path, priority, task_id, rank)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        index = self._worker_index()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = self._take(index)
+            if entry is not None:
+                self._held.discard(entry[-1])
+                return entry[-1]
+            with self._cond:
+                if self._shared.empty() and not any(self._deques):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    self._cond.wait(remaining)
+
+    def _worker_index(self):
+        index = getattr(self._local, "index", None)
+        if index is None:
+            with self._cond:
+                index = self._local.index = self._next_index % len(self._deques)
+                self._next_index += 1
+        return index
+
+    def _take(self, index):
+        own, lock = self._deques[index], self._locks[index]
+        best_shared = self._shared.peek()
+        with lock:
+            if own and (best_shared is None or own[0] <= best_shared):
+                return own.popleft()
+        # Refill with a fair share of the backlog, so one worker never hoards it
+        batch = self._shared.get_many(max(1, min(self.batch_size, self._shared.qsize() // len(self._deques))))
+        if batch:
+            self._held.update(entry[-1] for entry in batch)
+            with lock:
+                if own:
+                    merged = list(heapq.merge(own, batch))
+                    own.clear()
+                    own.extend(merged)
+                else:
+                    own.extend(batch)
+                return own.popleft()
+        with lock:
+            if own:
+                return own.popleft()
+        return self._steal(index)
+
+    def _steal(self, index):
+        victim = max(range(len(self._deques)), key=lambda i: len(self._deques[i]))
+        if victim == index or not self._deques[victim]:
+            return None
+        with self._locks[victim]:
+            stolen_deque = self._deques[victim]
+            # The back half: the victim keeps its best entries
+            stolen = [stolen_deque.pop() for _ in range((len(stolen_deque) + 1) // 2)]
+        if not stolen:
+            return None
+        stolen.reverse()
+        self.steals += 1
+        with self._locks[index]:
+            own = self._deques[index]
+            merged = list(heapq.merge(own, stolen))
+            own.clear()
+            own.extend(merged)
+            return own.popleft()
+
+    def task_done(self):
+        self._shared.task_done()
+
+    def empty(self):
+        return self._shared.empty() and not any(self._deques)
+
+    def qsize(self):
+        return self._shared.qsize() + sum(len(d) for d in self._deques)
+
+    def contains(self, file_path):
+        return self._shared.contains(file_path) or file_path in self._held
+
+    def _get_priority_value(self, priority_label):
+        return self._shared._get_priority_value(priority_label)
+
+    def get_priority_label(self, priority_value):
+        return self._shared.get_priority_label(priority_value)
+
+    def get_all_paths(self):
+        return self._shared.get_all_paths() + [entry[-1] for d in self._deques for entry in list(d)]
+
+# Task Dependency Graph
+# A task becomes eligible once all of its parents have completed. Tasks that unblock
+# others are ranked by their critical path (largest total cost down to a leaf).
+class TaskGraph:
+    def __init__(self):
+        self._parents = {}  # node -> set of parents not yet completed
+        self._children = {} # node -> set of dependent nodes
+        self._cost = {}     # node -> estimated cost (file size)
+        self._failed = set() # nodes that failed or were canceled; their late dependents are canceled too
+        self._rank_cache = {}
+        self._lock = threading.Lock()
+
+    def add(self, node, parents=(), cost=1):
+        # Returns "ready", "waiting" (on unfinished parents) or "canceled" (a parent failed).
+        # Parents that completed, or were never known, count as satisfied.
+        with self._lock:
+            self._failed.discard(node) # Re-adding a node starts it afresh
+            if any(p in self._failed for p in parents if p != node):
+                self._failed.add(node)
+                return "canceled"
+            pending = {p for p in parents if p in self._cost and p != node}
+            self._parents[node] = pending
+            self._children.setdefault(node, set())
+            self._cost[node] = max(cost, 1)
+            for parent in pending:
+                self._children[parent].add(node)
+            self._rank_cache.clear()
+            return "waiting" if pending else "ready"
+
+    def is_waiting(self, node):
+        with self._lock:
+            return bool(self._parents.get(node))
+
+    def rank(self, node):
+        # Critical path length for nodes with dependents, 0 for independent tasks
+        with self._lock:
+            if not self._children.get(node):
+                return 0
+            return self._critical_path(node)
+
+    def _critical_path(self, node):
+        if node in self._rank_cache:
+            return self._rank_cache[node]
+        # Iterative post-order walk so long chains don't hit the recursion limit
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._rank_cache:
+                continue
+            children = self._children.get(current, ())
+            if expanded:
+                below = max((self._rank_cache[c] for c in children), default=0)
+                self._rank_cache[current] = self._cost.get(current, 1) + below
+            else:
+                stack.append((current, True))
+                stack.extend((c, False) for c in children if c not in self._rank_cache)
+        return self._rank_cache[node]
+
+    def complete(self, node):
+        # Returns the dependents that became ready
+        with self._lock:
+            ready = []
+            for child in self._children.pop(node, ()):
+                pending = self._parents.get(child)
+                if pending is not None:
+                    pending.discard(node)
+                    if not pending:
+                        ready.append(child)
+            self._forget(node)
+            return ready
+
+    def fail(self, node):
+        # Returns every transitive dependent, which must be canceled without running
+        with self._lock:
+            doomed, stack = [], list(self._children.get(node, ()))
+            seen = set()
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                doomed.append(current)
+                stack.extend(self._children.get(current, ()))
+            for current in [node] + doomed:
+                self._children.pop(current, None)
+                self._forget(current)
+                self._failed.add(current)
+            return doomed
+
+    def _forget(self, node):
+        for parent in self._parents.pop(node, ()):
+            self._children.get(parent, set()).discard(node)
+        self._cost.pop(node, None)
+        self._rank_cache.clear()
+
+    def clear(self):
+        with self._lock:
+            self._parents.clear()
+            self._children.clear()
+            self._cost.clear()
+            self._failed.clear()
+            self._rank_cache.clear()
+
+# Multi-stage Pipeline
+# Each stage has its own worker threads and hands items to the next stage through a
+# bounded queue, so a slow stage blocks the stages feeding it (backpressure). A fan-out
+# stage turns one item into many (e.g. a file into chunks) by returning an iterator.
+class PipelineStage:
+    def __init__(self, name, func, workers=1, queue_size=8, fan_out=False):
+        self.name = name
+        self.func = func # item -> item for the next stage, or None to drop it
+        self.fan_out = fan_out # func returns an iterator of items instead
+        self.workers = max(1, int(workers))
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.busy_time = 0.0
+        self.processed = 0
+        self.lock = threading.Lock()
+
+class Pipeline:
+    def __init__(self, stages, on_done=None, on_error=None, on_drop=None):
+        self.stages = stages
+        self.on_done = on_done   # called with the item returned by the last stage
+        self.on_error = on_error # called with (item, exception)
+        self.on_drop = on_drop   # called with items abandoned because the pipeline stopped
+        self.stop_event = threading.Event()
+        self.threads = []
+        self._last_sample = None # (timestamp, [busy_time per stage])
+
+    def start(self):
+        self.stop_event.clear()
+        self.threads.clear()
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                t = threading.Thread(target=self._stage_loop, args=(index,), daemon=True, name=f"stage-{stage.name}-{len(self.threads)}")
+                t.start()
+                self.threads.append(t)
+        self._last_sample = (time.perf_counter(), [s.busy_time for s in self.stages])
+
+    def stop(self):
+        # Returns the items still waiting in the inter-stage queues. Stage threads exit on
+        # their own once the current item finishes, so this never blocks the caller.
+        self.stop_event.set()
+        leftovers = []
+        for stage in self.stages:
+            while True:
+                try:
+                    leftovers.append(stage.inbox.get_nowait())
+                except queue.Empty:
+                    break
+        return leftovers
+
+    def submit(self, item, timeout=None):
+        # Blocks while the first stage is full; raises queue.Full on timeout
+        self.stages[0].inbox.put(item, timeout=timeout)
+
+    def _put(self, index, item):
+        inbox = self.stages[index].inbox
+        while not self.stop_event.is_set():
+            try:
+                inbox.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage_loop(self, index):
+        stage = self.stages[index]
+        while not self.stop_event.is_set():
+            try:
+                item = stage.inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if not stage.fan_out:
+                self._forward(index, self._step(stage, item, stage.func, item))
+                continue
+            # Only the work between yields counts as busy, not the time spent blocked
+            # on the next stage's full queue
+            outputs = self._step(stage, item, lambda: iter(stage.func(item) or ()))
+            while outputs is not None:
+                result = self._step(stage, item, next, outputs, None)
+                if result is None or not self._forward(index, result):
+                    break
+            if outputs is not None and hasattr(outputs, "close"):
+                outputs.close() # Lets a generator that was cut short close its files
+
+    def _step(self, stage, item, func, *args):
+        # Runs a stage function (or one step of a fan-out iterator), charging the time to the stage
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(item, e)
+            return None
+        finally:
+            with stage.lock:
+                stage.busy_time += time.perf_counter() - start
+                stage.processed += 1
+
+    def _forward(self, index, result):
+        # Hands a result to the next stage (or on_done after the last); False if the pipeline stopped
+        if result is None:
+            return True
+        if index == len(self.stages) - 1:
+            if self.on_done:
+                self.on_done(result)
+            return True
+        if self._put(index + 1, result):
+            return True
+        if self.on_drop:
+            self.on_drop(result) # Stopped while blocked on a full queue
+        return False
+
+    def utilization(self):
+        # Fraction of stage worker time spent busy since the previous call
+        now = time.perf_counter()
+        busy = [s.busy_time for s in self.stages]
+        last_time, last_busy = self._last_sample or (now, busy)
+        elapsed = max(now - last_time, 1e-6)
+        self._last_sample = (now, busy)
+        stats = []
+        for stage, b, lb in zip(self.stages, busy, last_busy):
+            util = min(1.0, (b - lb) / (elapsed * stage.workers))
+            stats.append((stage.name, util, stage.inbox.qsize(), stage.inbox.maxsize))
+        return stats
+
+# --- Retries ---
+# Errors that are likely to clear up on their own (locks, busy devices, flaky mounts)
+TRANSIENT_ERRNOS = {errno.EAGAIN, errno.EWOULDBLOCK, errno.EBUSY, errno.EINTR, errno.ETIMEDOUT,
+                    errno.ESTALE, errno.ENOLCK, errno.EDEADLK, errno.ETXTBSY, errno.ECONNRESET,
+                    errno.ECONNABORTED, errno.ENETDOWN, errno.ENETUNREACH, errno.EHOSTUNREACH}
+TRANSIENT_WINERRORS = {32, 33} # ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION
+
+def classify_error(exc):
+    # Returns "transient" for failures worth retrying, "permanent" otherwise
+    if isinstance(exc, (TimeoutError, ConnectionError, BlockingIOError, InterruptedError)):
+        return "transient"
+    if getattr(exc, "transient", False): # Errors relayed from worker nodes
+        return "transient"
+    if isinstance(exc, OSError):
+        if getattr(exc, "winerror", None) in TRANSIENT_WINERRORS or exc.errno in TRANSIENT_ERRNOS:
+            return "transient"
+    return "permanent"
+
+class RetryPolicy:
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0, multiplier=2.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delay(self, attempt):
+        # Exponential backoff with "equal jitter": half the cap is fixed, half is random,
+        # so retries of files that failed together spread out but never retry instantly
+        cap = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def should_retry(self, exc, attempt):
+        return attempt <= self.max_retries and classify_error(exc) == "transient"
+
+# Delay queue: one timer thread sleeps until the earliest due entry, so tasks waiting to
+# retry never occupy a worker
+class DelayQueue:
+    def __init__(self):
+        self._heap = []  # (due_time, sequence, callback)
+        self._counter = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, delay, callback):
+        with self._cond:
+            self._counter += 1
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._counter, callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                _, _, callback = heapq.heappop(self._heap)
+            try:
+                callback()
+            except Exception:
+                pass
+
+# --- Metrics ---
+# HDR-style histogram: exact below 64 µs, then 32 linear sub-buckets per power of two,
+# so every recorded latency is kept within ~3% using a small sparse dict of counts.
+class LatencyHistogram:
+    SUB_BUCKET_BITS = 5
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+    def __init__(self):
+        self.counts = {} # bucket index -> count
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        seconds = max(0.0, seconds)
+        index = self._index(int(seconds * 1_000_000))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def _index(self, micros):
+        if micros < 2 * self.SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - self.SUB_BUCKET_BITS - 1
+        return shift * self.SUB_BUCKETS + (micros >> shift)
+
+    def _upper_bound(self, index):
+        # Largest value (seconds) that falls in the bucket
+        if index < 2 * self.SUB_BUCKETS:
+            return index / 1_000_000
+        shift = index // self.SUB_BUCKETS - 1
+        mantissa = index - shift * self.SUB_BUCKETS
+        return (((mantissa + 1) << shift) - 1) / 1_000_000
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        target = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds):
+        # Counts at or below each bound, for Prometheus "le" buckets. A bucket only counts once
+        # its upper bound is within the limit, so a bucket straddling it never inflates the count.
+        result, seen = [], 0
+        items = sorted(self.counts.items())
+        position = 0
+        for bound in bounds:
+            while position < len(items) and self._upper_bound(items[position][0]) <= bound:
+                seen += items[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+class MetricsRecorder:
+    PRIORITIES = ("High", "Medium", "Low")
+    RATE_WINDOW = 60.0 # Seconds of finished tasks used for files/sec and bytes/sec
+    PROMETHEUS_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait = {p: LatencyHistogram() for p in self.PRIORITIES}       # enqueue -> start
+        self.processing = {p: LatencyHistogram() for p in self.PRIORITIES} # start -> finish
+        self.statuses = collections.Counter()
+        self.bytes_total = 0
+        self._recent = collections.deque() # (finish_time, size) of completed tasks
+
+    def record(self, priority, enqueued, started, finished, size, status):
+        # Timestamps are time.monotonic() values; started is None if the task never ran
+        with self._lock:
+            self.statuses[status] += 1
+            if priority in self.wait and started is not None:
+                if enqueued is not None:
+                    self.wait[priority].record(started - enqueued)
+                self.processing[priority].record(finished - started)
+            if status == "Completed":
+                self.bytes_total += size
+                self._recent.append((finished, size))
+
+    def rates(self):
+        with self._lock:
+            cutoff = time.monotonic() - self.RATE_WINDOW
+            while self._recent and self._recent[0][0] < cutoff:
+                self._recent.popleft()
+            if not self._recent:
+                return 0.0, 0.0
+            span = max(time.monotonic() - self._recent[0][0], 1.0)
+            return len(self._recent) / span, sum(size for _, size in self._recent) / span
+
+    def snapshot(self):
+        # Rows of (priority, count, wait p50/p90/p99, processing p50/p90/p99/max) in seconds
+        with self._lock:
+            rows = []
+            for p in self.PRIORITIES:
+                w, h = self.wait[p], self.processing[p]
+                rows.append((p, h.count, w.percentile(50), w.percentile(90), w.percentile(99),
+                             h.percentile(50), h.percentile(90), h.percentile(99), h.max))
+            return rows
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for metric, histograms, help_text in (
+                    ("task_queue_wait_seconds", self.wait, "Time tasks spent queued before processing started."),
+                    ("task_queue_processing_seconds", self.processing, "Time from processing start to finish.")):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for priority, histogram in histograms.items():
+                    for bound, count in zip(self.PROMETHEUS_BOUNDS, histogram.cumulative(self.PROMETHEUS_BOUNDS)):
+                        lines.append(f'{metric}_bucket{{priority="{priority}",le="{bound}"}} {count}')
+                    lines.append(f'{metric}_bucket{{priority="{priority}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{metric}_sum{{priority="{priority}"}} {histogram.total:.6f}')
+                    lines.append(f'{metric}_count{{priority="{priority}"}} {histogram.count}')
+            lines.append("# HELP task_queue_tasks_total Finished tasks by final status.")
+            lines.append("# TYPE task_queue_tasks_total counter")
+            for status, count in sorted(self.statuses.items()):
+                lines.append(f'task_queue_tasks_total{{status="{status}"}} {count}')
+            lines.append("# HELP task_queue_bytes_total Bytes of completed input files.")
+            lines.append("# TYPE task_queue_bytes_total counter")
+            lines.append(f"task_queue_bytes_total {self.bytes_total}")
+        return "\n".join(lines) + "\n"
+
+# --- Resource Accounting ---
+# Per-task CPU time, bytes read and (sampled) peak allocation. tracemalloc slows every
+# allocation in the process while it runs, so only one task in MEMORY_SAMPLE_EVERY is
+# traced, one at a time; its peak also includes whatever other workers allocated meanwhile.
+class ResourceAccountant:
+    MEMORY_SAMPLE_EVERY = 10
+
+    def __init__(self):
+        self.enabled = True
+        self.overhead = 0.0 # Seconds spent inside begin()/end(), including tracemalloc start/stop
+        self.tasks = 0
+        self._started = 0
+        self._lock = threading.Lock()
+        self._trace_lock = threading.Lock()
+
+    def begin(self, trace=True):
+        # Call from the thread that runs the task; returns None when accounting is off
+        if not self.enabled:
+            return None
+        t0 = time.perf_counter()
+        token = {"cpu": time.thread_time(), "traced": False}
+        with self._lock:
+            self._started += 1
+            sample = self._started % self.MEMORY_SAMPLE_EVERY == 1
+        if trace and sample and not tracemalloc.is_tracing() and self._trace_lock.acquire(blocking=False):
+            tracemalloc.start()
+            token["traced"] = True
+        token["overhead"] = time.perf_counter() - t0
+        return token
+
+    def end(self, token, bytes_read, child_stats=None):
+        # child_stats replaces thread measurements when the work ran in another process
+        t0 = time.perf_counter()
+        stats = {"cpu": time.thread_time() - token["cpu"], "bytes_read": bytes_read, "peak_mem": self._untrace(token)}
+        if child_stats:
+            stats.update(child_stats)
+        with self._lock:
+            self.overhead += token["overhead"] + time.perf_counter() - t0
+            self.tasks += 1
+        return stats
+
+    def abandon(self, token):
+        # For the watchdog: a timed-out task may never reach end(), so its sample is cut short here
+        if token is not None:
+            self._untrace(token)
+
+    def _untrace(self, token):
+        # Stops the token's tracing exactly once, from end() or abandon(); returns the peak
+        with self._lock:
+            traced, token["traced"] = token["traced"], False
+        if not traced:
+            return None
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._trace_lock.release()
+        return peak
+
+    def overhead_per_task(self):
+        with self._lock:
+            return self.overhead / self.tasks if self.tasks else 0.0
+
+class CountingReader:
+    # File wrapper that adds every byte read to the task's bytes_read counter
+    def __init__(self, raw, ctx):
+        self._raw = raw
+        self._ctx = ctx
+
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        self._ctx.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        self._ctx.bytes_read += n or 0
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._raw.close()
+
+# --- Tracing ---
+# Records worker activity as Chrome trace events (open the export in Perfetto or
+# chrome://tracing). Events go into a bounded deque, so a long run keeps the latest ones.
+class TraceRecorder:
+    MAX_EVENTS = 200_000
+
+    def __init__(self):
+        self.enabled = False
+        self._events = collections.deque(maxlen=self.MAX_EVENTS)
+        self._thread_names = {}
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def now(self):
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def _add(self, event):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        event["pid"] = self._pid
+        event["tid"] = tid
+        self._events.append(event)
+
+    def complete(self, name, start, cat="task", args=None):
+        # A span from start (a now() value) until this call
+        if self.enabled:
+            self._add({"name": name, "cat": cat, "ph": "X", "ts": start, "dur": self.now() - start, "args": args or {}})
+
+    def instant(self, name, cat="task", args=None):
+        if self.enabled:
+            self._add({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self.now(), "args": args or {}})
+
+    def counter(self, name, values):
+        if self.enabled:
+            self._add({"name": name, "ph": "C", "ts": self.now(), "args": values})
+
+    def clear(self):
+        self._events.clear()
+
+    def export(self, path):
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in list(self._thread_names.items())]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + list(self._events), "displayTimeUnit": "ms"}, f)
+
+# --- Profiling ---
+# Runs cProfile around a random fraction of processor calls and merges the results per
+# processor. Only one call is profiled at a time (cProfile hooks are per interpreter on
+# newer Pythons), so under heavy concurrency the effective sample rate is lower.
+class ProcessorProfiler:
+    def __init__(self, fraction=0.1):
+        self.enabled = False
+        self.fraction = fraction
+        self.samples = collections.Counter() # processor name -> profiled calls
+        self._stats = {}                     # processor name -> merged pstats.Stats
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+
+    def run(self, processor_name, func, *args):
+        if not self.enabled or random.random() >= self.fraction or not self._active.acquire(blocking=False):
+            return func(*args)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args)
+        finally:
+            self._active.release()
+            with self._lock:
+                if processor_name in self._stats:
+                    self._stats[processor_name].add(profile)
+                else:
+                    self._stats[processor_name] = pstats.Stats(profile)
+                self.samples[processor_name] += 1
+
+    def processors(self):
+        with self._lock:
+            return sorted(self._stats)
+
+    def report(self, processor_name, limit=40):
+        stream = io.StringIO()
+        with self._lock:
+            stats = self._stats.get(processor_name)
+            if stats is None:
+                return "No samples yet."
+            stats.stream = stream
+            stats.sort_stats("cumulative").print_stats(limit)
+        return f"{self.samples[processor_name]} profiled call(s)\n" + stream.getvalue()
+
+    def dump(self, folder):
+        # Writes one .pstats file per processor; returns the paths
+        paths = []
+        with self._lock:
+            for processor_name, stats in self._stats.items():
+                safe_name = "".join(c if c.isalnum() else "_" for c in processor_name).strip("_")
+                path = os.path.join(folder, f"{safe_name}.pstats")
+                stats.dump_stats(path)
+                paths.append(path)
+        return paths
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+            self.samples.clear()
+
+# --- History Store ---
+# Finished tasks live in SQLite instead of Treeview rows, so history survives restarts and
+# the UI only ever holds one page. Filters and sorts run as indexed queries.
+class HistoryStore:
+    COLUMNS = ("task_id", "file_path", "file_name", "priority", "priority_value", "processor", "completed_at",
+               "duration", "wait", "processing", "cpu", "bytes_read", "peak_mem", "size", "status")
+    SORT_COLUMNS = {"id": "task_id", "file": "file_name", "priority": "priority_value", "completed": "completed_at",
+                    "duration": "duration", "wait": "wait", "processing": "processing", "cpu": "cpu",
+                    "read": "bytes_read", "peak_mem": "peak_mem", "status": "status"}
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL") # Lets exports read while new rows are written
+        self._conn.execute("PRAGMA synchronous=NORMAL") # WAL commits skip the fsync; a crash loses at most the last few rows
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS history (
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER, file_path TEXT, file_name TEXT, priority TEXT, priority_value INTEGER,
+            processor TEXT, completed_at REAL, duration REAL, wait REAL, processing REAL,
+            cpu REAL, bytes_read INTEGER, peak_mem INTEGER, size INTEGER, status TEXT)""")
+        # Filter columns plus every sortable column, so each page is an index walk rather than a sort
+        for column in ("status", "priority", *self.SORT_COLUMNS.values()):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_history_{column} ON history ({column})")
+        self._conn.commit()
+        self._pending = [] # Rows added since the last flush
+        # Row counts per (status, priority), kept in memory so the UI never runs COUNT(*) or GROUP BY
+        self._counts = collections.Counter(
+            {(status, priority): n for status, priority, n in
+             self._conn.execute("SELECT status, priority, COUNT(*) FROM history GROUP BY status, priority")})
+
+    def add(self, record):
+        # record: dict keyed by COLUMNS; missing values are stored as NULL. Rows are buffered and
+        # written by flush(), which every query runs first, so callers never see them missing.
+        with self._lock:
+            self._pending.append([record.get(column) for column in self.COLUMNS])
+            self._counts[record.get("status"), record.get("priority")] += 1
+
+    def flush(self):
+        # Inserts buffered rows in one transaction: one commit per batch instead of one per task
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        self._conn.executemany(f"INSERT INTO history ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                               self._pending)
+        self._conn.commit()
+        self._pending = []
+
+    def _where(self, status, priority):
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if priority:
+            clauses.append("priority = ?")
+            params.append(priority)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _order(self, sort_column, descending):
+        column = self.SORT_COLUMNS.get(sort_column, "completed_at")
+        direction = "DESC" if descending else "ASC"
+        return f" ORDER BY {column} {direction}, row_id {direction}"
+
+    def count(self, status=None, priority=None):
+        with self._lock:
+            return sum(n for (s, p), n in self._counts.items()
+                       if (status is None or s == status) and (priority is None or p == priority))
+
+    def counts_by_status(self):
+        with self._lock:
+            counts = collections.Counter()
+            for (status, _), n in self._counts.items():
+                counts[status] += n
+            return dict(counts)
+
+    def page(self, status=None, priority=None, sort_column="completed", descending=True, limit=HISTORY_PAGE_SIZE, offset=0):
+        where, params = self._where(status, priority)
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM history{where}{self._order(sort_column, descending)} LIMIT ? OFFSET ?"
+        with self._lock:
+            self._flush_locked()
+            cursor = self._conn.execute(sql, params + [limit, offset])
+            return [dict(zip(self.COLUMNS, row)) for row in cursor.fetchall()]
+
+    def iter_rows(self, status=None, priority=None, sort_column="completed", descending=False, chunk_size=5000):
+        # Streams matching rows as dicts in chunks over a separate connection (safe from any thread)
+        where, params = self._where(status, priority)
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM history{where}{self._order(sort_column, descending)}"
+        self.flush() # The separate connection only sees committed rows
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(zip(self.COLUMNS, row)) for row in rows]
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+# --- History Export ---
+# Streams HistoryStore rows to disk on a background thread, one chunk at a time, so exporting a
+# large history never blocks Tk or holds every row in memory. JSONL and Parquet keep numeric types.
+class HistoryExporter:
+    CSV_HEADER = ["Task ID", "File Path", "File Name", "Priority", "Priority Value", "Processor", "Completed At",
+                  "Duration (s)", "Queue Wait (s)", "Processing (s)", "CPU (s)", "Bytes Read", "Peak Memory (B)",
+                  "Size (B)", "Finish Status"]
+
+    def __init__(self, store, path, status=None, priority=None, sort=("completed", False), on_progress=None, on_done=None):
+        self.store = store
+        self.path = path
+        self.status = status
+        self.priority = priority
+        self.sort = sort
+        self.on_progress = on_progress # on_progress(rows_written, total_rows)
+        self.on_done = on_done         # on_done(rows_written, error_or_None)
+        self.cancelled = threading.Event()
+        self.written = 0
+        self.format = self.format_for(path)
+
+    @staticmethod
+    def formats():
+        formats = [("CSV files", "*.csv"), ("JSON Lines", "*.jsonl")]
+        if HAS_PYARROW:
+            formats.append(("Parquet files", "*.parquet"))
+        return formats
+
+    @staticmethod
+    def format_for(path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".parquet":
+            if not HAS_PYARROW:
+                raise ValueError("Parquet export requires pyarrow")
+            return "parquet"
+        return "jsonl" if extension in (".jsonl", ".ndjson") else "csv"
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name="history-export").start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _chunks(self):
+        # Yields chunks of row dicts and reports progress after each one is written
+        total = self.store.count(self.status, self.priority)
+        for chunk in self.store.iter_rows(self.status, self.priority, *self.sort):
+            if self.cancelled.is_set():
+                raise InterruptedError("Export cancelled")
+            yield chunk
+            self.written += len(chunk)
+            if self.on_progress:
+                self.on_progress(self.written, total)
+
+    def _run(self):
+        error = None
+        temp_path = self.path + ".part" # Only a complete export replaces the target file
+        try:
+            getattr(self, f"_write_{self.format}")(temp_path)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            error = e
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        if self.on_done:
+            self.on_done(self.written, error)
+
+    @staticmethod
+    def _iso(timestamp):
+        return datetime.fromtimestamp(timestamp).isoformat(timespec="milliseconds") if timestamp is not None else None
+
+    def _write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_HEADER)
+            for chunk in self._chunks():
+                for record in chunk:
+                    record["completed_at"] = self._iso(record["completed_at"])
+                writer.writerows([["" if record[c] is None else record[c] for c in HistoryStore.COLUMNS] for record in chunk])
+
+    def _write_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in self._chunks():
+                for record in chunk:
+                    record["completed_at"] = self._iso(record["completed_at"])
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in chunk))
+
+    def _write_parquet(self, path):
+        schema = pyarrow.schema([
+            ("task_id", pyarrow.int64()), ("file_path", pyarrow.string()), ("file_name", pyarrow.string()),
+            ("priority", pyarrow.string()), ("priority_value", pyarrow.int8()), ("processor", pyarrow.string()),
+            ("completed_at", pyarrow.timestamp("us")), ("duration", pyarrow.float64()), ("wait", pyarrow.float64()),
+            ("processing", pyarrow.float64()), ("cpu", pyarrow.float64()), ("bytes_read", pyarrow.int64()),
+            ("peak_mem", pyarrow.int64()), ("size", pyarrow.int64()), ("status", pyarrow.string()),
+        ])
+        with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+            for chunk in self._chunks():
+                for record in chunk:
+                    if record["completed_at"] is not None:
+                        record["completed_at"] = datetime.fromtimestamp(record["completed_at"])
+                writer.write_table(pyarrow.Table.from_pylist(chunk, schema=schema)) # One row group per chunk
+
+# --- Folder Watching ---
+# Keeps a snapshot of path -> (size, mtime_ns) and reports only new or modified files.
+# Changes are discovered with Linux inotify (via ctypes) when available, otherwise by an
+# os.scandir poll that rescans only the directories whose mtime changed. Either way a file
+# is reported only after its stat has been stable for `settle` seconds, so files that are
+# still being written are not picked up early.
+class FolderWatcher:
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+
+    def __init__(self, folder, on_files, recursive=True, ignore=(), settle=WATCH_SETTLE, poll_interval=WATCH_POLL_INTERVAL):
+        self.folder = os.path.abspath(folder)
+        self.on_files = on_files # on_files(list_of_paths), called from the watcher thread
+        self.recursive = recursive
+        self.ignore = [os.path.abspath(path) for path in ignore] # e.g. the output folder, to avoid feedback loops
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.snapshot = {}  # path -> (size, mtime_ns) of files already reported or present at start
+        self.pending = {}   # path -> ((size, mtime_ns), last_change_monotonic)
+        self._stop = threading.Event()
+        self._thread = None
+        self._libc = None
+        self._fd = None
+        self._watches = {}  # wd -> directory
+        self._wake = None   # self-pipe (read fd, write fd) that interrupts the inotify select
+        self._dirs = {}     # poll mode: directory -> (mtime_ns, file paths, subdirectories) at its last scan
+        self._polls = 0
+        self.mode = "poll"
+
+    def start(self):
+        self._init_inotify()
+        # Files present at start are the baseline, not new work
+        if self._fd is not None:
+            self._wake = os.pipe()
+            for path, stat in self._scan():
+                self.snapshot[path] = stat
+        else:
+            self._rescan([self.folder], None)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="folder-watcher")
+        self._thread.start()
+
+    def stop(self):
+        # Blocks until the thread has exited, so its descriptors are never closed under it.
+        # on_files may be mid-call when this runs, so Tk callers stop from another thread.
+        self._stop.set()
+        if self._wake:
+            os.write(self._wake[1], b"\0")
+        if self._thread:
+            self._thread.join()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._wake:
+            for fd in self._wake:
+                os.close(fd)
+            self._wake = None
+
+    def _is_ignored(self, path):
+        return any(path == ignored or path.startswith(ignored + os.sep) for ignored in self.ignore)
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def _scan(self):
+        # Yields (path, (size, mtime_ns)) for every regular file under the folder
+        stack = [self.folder]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if self._is_ignored(entry.path):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    stack.append(entry.path)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                yield entry.path, (st.st_size, st.st_mtime_ns)
+                        except OSError:
+                            continue # Vanished between listing and stat
+            except OSError:
+                continue
+
+    def _rescan(self, directories, now):
+        # Poll mode: lists the given directories and any new subdirectories below them. Files
+        # are observed (or taken as the baseline when now is None); entries gone since the
+        # directory's last scan are forgotten.
+        stack = list(directories)
+        while stack:
+            directory = stack.pop()
+            files, subdirs = set(), set()
+            try:
+                mtime = os.stat(directory).st_mtime_ns # Read first, so changes during the scan show next time
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if self._is_ignored(entry.path):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    subdirs.add(entry.path)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                files.add(entry.path)
+                                if now is None:
+                                    self.snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+                                else:
+                                    self._observe(entry.path, (st.st_size, st.st_mtime_ns), now)
+                        except OSError:
+                            continue # Vanished between listing and stat
+            except OSError:
+                self._drop_directory(directory, now)
+                continue
+            previous = self._dirs.get(directory)
+            self._dirs[directory] = (mtime, files, subdirs)
+            if previous:
+                for path in previous[1] - files:
+                    self._observe(path, None, now) # Deleted files count as new if they reappear
+                for subdir in previous[2] - subdirs:
+                    self._drop_directory(subdir, now)
+            stack.extend(subdir for subdir in subdirs if subdir not in self._dirs)
+
+    def _drop_directory(self, directory, now):
+        entry = self._dirs.pop(directory, None)
+        if entry:
+            for path in entry[1]:
+                self._observe(path, None, now)
+            for subdir in entry[2]:
+                self._drop_directory(subdir, now)
+
+    def _poll(self, now):
+        # Creating, deleting or renaming an entry updates its directory's mtime, so only those
+        # directories are listed again; every WATCH_FULL_SCAN_EVERY polls all of them are
+        self._polls += 1
+        full = self._polls % WATCH_FULL_SCAN_EVERY == 0
+        changed = [] if self.folder in self._dirs else [self.folder]
+        for directory, (mtime, _, _) in list(self._dirs.items()):
+            try:
+                if full or os.stat(directory).st_mtime_ns != mtime:
+                    changed.append(directory)
+            except OSError:
+                changed.append(directory) # _rescan drops it
+        self._rescan(changed, now)
+
+    # inotify
+
+    def _init_inotify(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return # Not Linux, or no inotify in this libc
+        if fd < 0:
+            return
+        self._libc, self._fd = libc, fd
+        directories = [self.folder]
+        if self.recursive:
+            directories += [root for root, _, _ in os.walk(self.folder) if root != self.folder and not self._is_ignored(root)]
+        for directory in directories:
+            if not self._add_watch(directory):
+                # Usually max_user_watches exhausted; polling still covers everything
+                os.close(self._fd)
+                self._fd, self._watches = None, {}
+                return
+        self.mode = "inotify"
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            return False
+        self._watches[wd] = directory
+        return True
+
+    def _read_events(self, timeout):
+        # Returns the set of paths touched since the last call, or None if events were lost
+        ready, _, _ = select.select([self._fd, self._wake[0]], [], [], timeout)
+        if self._fd not in ready:
+            return set() # Timed out, or stop() woke us
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        touched = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & (self.IN_IGNORED | self.IN_DELETE_SELF):
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if self._is_ignored(path):
+                continue
+            if mask & self.IN_ISDIR:
+                if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Watch the new directory and pick up anything written into it before the watch existed
+                    for root, _, files in os.walk(path):
+                        if not self._is_ignored(root):
+                            self._add_watch(root)
+                            touched.update(os.path.join(root, f) for f in files)
+                continue
+            touched.add(path)
+        return touched
+
+    # Main loop
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._fd is not None:
+                # Wakes on events, and at least every poll_interval to settle pending files
+                touched = self._read_events(self.poll_interval)
+                if touched is None:
+                    touched = [path for path, _ in self._scan()] # Queue overflowed: rescan everything
+                now = time.monotonic()
+                for path in touched:
+                    self._observe(path, self._stat(path), now)
+            else:
+                if self._stop.wait(self.poll_interval):
+                    break
+                self._poll(time.monotonic())
+            self._settle()
+
+    def _observe(self, path, stat, now):
+        if stat is None:
+            self.pending.pop(path, None)
+            self.snapshot.pop(path, None)
+            return
+        if stat == self.snapshot.get(path):
+            return
+        previous = self.pending.get(path)
+        if previous is None or previous[0] != stat:
+            self.pending[path] = (stat, now) # New change: restart the settle timer
+
+    def _settle(self):
+        now = time.monotonic()
+        ready = []
+        for path, (stat, changed_at) in list(self.pending.items()):
+            if now - changed_at < self.settle:
+                continue
+            current = self._stat(path)
+            if current is None:
+                del self.pending[path]
+            elif current != stat:
+                self.pending[path] = (current, now) # Still being written
+            else:
+                del self.pending[path]
+                self.snapshot[path] = stat
+                ready.append(path)
+        if ready and not self._stop.is_set():
+            self.on_files(sorted(ready))
+
+# --- Checkpoints ---
+# Interrupted tasks record how far they got so pause/resume (and an app restart) continues
+# from that offset. Entries are only reused while the source file is unchanged and the
+# same processor is selected. JSON-serializable state is persisted; "live" state (such as
+# a hash object) only survives within the current session.
+class CheckpointStore:
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._entries = {}
+        self._live = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, file_path, processor):
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if not entry or entry["processor"] != processor:
+                return None
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return None
+            if (st.st_size, st.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+                return None
+            return dict(entry, live=self._live.get(file_path))
+
+    def save(self, file_path, processor, offset, total, state=None, live=None):
+        st = os.stat(file_path)
+        with self._lock:
+            self._entries[file_path] = {
+                "processor": processor,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "offset": offset,
+                "percent": int(offset * 100 / total) if total else 0,
+                "state": state,
+            }
+            self._live[file_path] = live
+            self._flush()
+
+    def discard(self, file_path):
+        with self._lock:
+            self._live.pop(file_path, None)
+            if self._entries.pop(file_path, None) is not None:
+                self._flush()
+
+    def _flush(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+# --- File Processors ---
+# A processor does the work for one task. It reports progress and polls for pause/cancel
+# through a TaskContext, which keeps processors independent of the Tk UI.
+class TaskContext:
+    def __init__(self, file_path, output_dir, should_stop, on_progress, checkpoint=None, on_checkpoint=None):
+        self.file_path = file_path
+        self.output_dir = output_dir
+        self.should_stop = should_stop  # callable -> True when the task must stop now
+        self.on_progress = on_progress  # callable(percent, detail); detail is (done, total, unit) or None
+        self.checkpoint = checkpoint    # dict from CheckpointStore.get() when resuming, else None
+        self.on_checkpoint = on_checkpoint # callable(offset, total, state, live)
+        self.bytes_read = 0
+        self._last_percent = None
+
+    def open_source(self):
+        # Processors read their input through this so resource accounting sees the bytes
+        return CountingReader(open(self.file_path, "rb"), self)
+
+    def save_checkpoint(self, offset, total, state=None, live=None):
+        # Called by processors when interrupted; offset is in the processor's own units
+        if self.on_checkpoint:
+            self.on_checkpoint(offset, total, state, live)
+
+    def resume_offset(self):
+        return self.checkpoint["offset"] if self.checkpoint else 0
+
+    def report(self, done, total, unit=None):
+        # unit ("bytes", "blocks", ...) adds a done/total detail next to the percentage
+        percent = int(done * 100 / total) if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.on_progress(percent, (done, total, unit) if unit else None)
+
+    def output_path(self, suffix=""):
+        return os.path.join(self.output_dir, os.path.basename(self.file_path) + suffix)
+
+class FileProcessor:
+    name = None
+    pipelined = False # True when transform_chunk/open_sink give the processor a form for pipeline mode
+
+    def run(self, ctx):
+        # Returns True when finished, False when interrupted by pause/cancel/stop
+        raise NotImplementedError
+
+    def transform_chunk(self, data):
+        # Pipeline mode: runs on any transform worker and in any order, so it must keep no state
+        return data
+
+    def open_sink(self, ctx):
+        # Pipeline mode: returns a sink that receives the transformed chunks in input order
+        raise NotImplementedError
+
+# Outputs are written to a ".part" file and published when complete, so an interrupted run
+# never leaves a truncated output behind. An existing output is never replaced: it may belong
+# to another input with the same name, so the task fails instead.
+def check_output_free(dest):
+    if os.path.exists(dest):
+        raise FileExistsError(errno.EEXIST, "Output already exists", dest)
+
+def publish_output(path, dest):
+    # Renames path to dest unless dest exists; a hard link makes the check and the rename atomic
+    try:
+        os.link(path, dest)
+    except FileExistsError:
+        raise FileExistsError(errno.EEXIST, "Output already exists", dest) from None
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            raise
+        check_output_free(dest) # No hard links on this filesystem
+        os.replace(path, dest)
+        return
+    os.remove(path)
+
+# Pipeline mode's write side
+class OutputSink:
+    def __init__(self, dest, on_finish=None):
+        check_output_free(dest)
+        self.dest = dest
+        self.part_path = dest + ".part"
+        self.on_finish = on_finish
+        self.file = open(self.part_path, "wb")
+
+    def write(self, data):
+        self.file.write(data)
+
+    def finish(self):
+        self.file.close()
+        publish_output(self.part_path, self.dest)
+        if self.on_finish:
+            self.on_finish()
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.part_path)
+        except OSError:
+            pass
+
+class DigestSink:
+    # Checksums in pipeline mode: chunks only feed the running state, the digest is written at the end
+    def __init__(self, processor, ctx):
+        self.processor = processor
+        self.ctx = ctx
+        _, self.state = processor.start(None)
+
+    def write(self, data):
+        self.state = self.processor.update(self.state, data)
+
+    def finish(self):
+        self.processor.write_digest(self.ctx, self.state)
+
+    def abort(self):
+        pass
+
+class SimulatedProcessor(FileProcessor):
+    name = "Simulate"
+
+    def run(self, ctx):
+        for i in range(ctx.resume_offset() + 1, 101):
+            if ctx.should_stop():
+                ctx.save_checkpoint(i - 1, 100)
+                return False
+            time.sleep(0.02)
+            ctx.report(i, 100)
+        return True
+
+# Kernel copy errors that mean "not supported here" rather than a real I/O failure
+COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSOCK,
+                        getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL)}
+
+def copy_file_contents(src, dest, ctx, offset=0):
+    # Copies in the kernel with copy_file_range, then sendfile, then a read/write loop,
+    # falling back whenever the filesystem pair does not support the faster method.
+    # A non-zero offset continues a partial copy left by an earlier interruption.
+    methods = [m for m in ("copy_file_range", "sendfile") if hasattr(os, m)] + ["buffered"]
+    # Opening dest for writing would truncate the source when both are the same file
+    if os.path.exists(dest) and os.path.samefile(src, dest):
+        raise shutil.SameFileError(f"{src!r} and {dest!r} are the same file")
+    if offset and (not os.path.exists(dest) or os.path.getsize(dest) < offset):
+        offset = 0
+    with open(src, "rb", buffering=0) as fsrc, open(dest, "r+b" if offset else "wb", buffering=0) as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        fdst.truncate(offset)
+        os.lseek(in_fd, offset, os.SEEK_SET)
+        os.lseek(out_fd, offset, os.SEEK_SET)
+        done = offset
+        buffer = None
+        ctx.report(done, size, unit="bytes")
+        while done < size:
+            if ctx.should_stop():
+                ctx.save_checkpoint(done, size)
+                return False
+            count = min(COPY_CHUNK_SIZE, size - done)
+            method = methods[0]
+            try:
+                if method == "copy_file_range":
+                    copied = os.copy_file_range(in_fd, out_fd, count)
+                elif method == "sendfile":
+                    copied = os.sendfile(out_fd, in_fd, done, count)
+                else:
+                    if buffer is None:
+                        buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+                    copied = 0
+                    while copied < count:
+                        n = fsrc.readinto(buffer[:min(COPY_BUFFER_SIZE, count - copied)])
+                        if not n:
+                            break
+                        fdst.write(buffer[:n])
+                        copied += n
+            except OSError as e:
+                if method == "buffered" or e.errno not in COPY_FALLBACK_ERRNOS:
+                    raise
+                methods.pop(0)
+                # Realign both descriptors so the next method continues where this one stopped
+                os.lseek(in_fd, done, os.SEEK_SET)
+                os.lseek(out_fd, done, os.SEEK_SET)
+                continue
+            if copied == 0:
+                break # Source shrank while copying
+            done += copied
+            ctx.bytes_read += copied
+            ctx.report(done, size, unit="bytes")
+    return True
+
+class CopyProcessor(FileProcessor):
+    name = "Copy"
+    pipelined = True
+
+    def run(self, ctx):
+        os.makedirs(ctx.output_dir, exist_ok=True)
+        dest = ctx.output_path()
+        check_output_free(dest)
+        part_path = dest + ".part"
+        if not copy_file_contents(ctx.file_path, part_path, ctx, offset=ctx.resume_offset()):
+            return False
+        shutil.copystat(ctx.file_path, part_path)
+        publish_output(part_path, dest)
+        return True
+
+    def open_sink(self, ctx):
+        os.makedirs(ctx.output_dir, exist_ok=True)
+        dest = ctx.output_path()
+        return OutputSink(dest, on_finish=lambda: self.finish_output(ctx, dest))
+
+    def finish_output(self, ctx, dest):
+        shutil.copystat(ctx.file_path, dest)
+
+class MoveProcessor(CopyProcessor):
+    name = "Move"
+
+    def run(self, ctx):
+        os.makedirs(ctx.output_dir, exist_ok=True)
+        dest = ctx.output_path()
+        # Same filesystem: a rename moves no data at all
+        if os.stat(ctx.file_path).st_dev == os.stat(ctx.output_dir).st_dev:
+            try:
+                publish_output(ctx.file_path, dest)
+                ctx.report(1, 1)
+                return True
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        if not super().run(ctx):
+            return False
+        os.remove(ctx.file_path)
+        return True
+
+    def finish_output(self, ctx, dest):
+        super().finish_output(ctx, dest)
+        os.remove(ctx.file_path)
+
+# Parallel compression: one input is cut into independent blocks that are compressed in
+# a process pool and written in order. Concatenated gzip members and xz streams are both
+# valid files for the standard tools, so no custom container is needed.
+_compression_pool = None
+_compression_pool_lock = threading.Lock()
+
+def get_compression_pool():
+    global _compression_pool
+    with _compression_pool_lock:
+        if _compression_pool is None:
+            if multiprocessing.current_process().daemon:
+                # Process backend workers are daemonic and may not start children; zlib and
+                # lzma release the GIL, so threads still compress blocks in parallel
+                _compression_pool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+            else:
+                # spawn: forking a process that owns Tk and worker threads is not safe
+                _compression_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+        return _compression_pool
+
+def shutdown_compression_pool():
+    global _compression_pool
+    with _compression_pool_lock:
+        if _compression_pool is not None:
+            _compression_pool.shutdown(wait=False, cancel_futures=True)
+            _compression_pool = None
+
+def compress_block(data, fmt):
+    if fmt == "xz":
+        return lzma.compress(data, preset=6)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+class CompressProcessor(FileProcessor):
+    name = "Compress (gzip)"
+    fmt = "gzip"
+    suffix = ".gz"
+    pipelined = True
+
+    def transform_chunk(self, data):
+        return compress_block(data, self.fmt) # Independent blocks, as in run()
+
+    def open_sink(self, ctx):
+        os.makedirs(ctx.output_dir, exist_ok=True)
+        return OutputSink(ctx.output_path(self.suffix))
+
+    def run(self, ctx):
+        os.makedirs(ctx.output_dir, exist_ok=True)
+        pool = get_compression_pool()
+        window = 2 * (os.cpu_count() or 1) # Blocks in flight; bounds memory to window * block size
+        total_blocks = max(1, -(-os.path.getsize(ctx.file_path) // COMPRESS_BLOCK_SIZE))
+        in_flight = collections.deque()
+        final_path = ctx.output_path(self.suffix)
+        check_output_free(final_path)
+        dest_path = final_path + ".part"
+
+        # Blocks are independent, so resuming only needs the input offset and the output
+        # length at the last fully written block
+        offset, output_size = 0, 0
+        if ctx.checkpoint and ctx.checkpoint["state"]:
+            output_size = ctx.checkpoint["state"]["output_size"]
+            if os.path.exists(dest_path) and os.path.getsize(dest_path) >= output_size:
+                offset = ctx.checkpoint["offset"]
+            else:
+                output_size = 0
+        written = offset // COMPRESS_BLOCK_SIZE
+        ctx.report(written, total_blocks, unit="blocks")
+
+        with ctx.open_source() as src, open(dest_path, "r+b" if offset else "wb") as dest:
+            src.seek(offset)
+            dest.truncate(output_size)
+            dest.seek(output_size)
+            try:
+                while True:
+                    if ctx.should_stop():
+                        ctx.save_checkpoint(written * COMPRESS_BLOCK_SIZE, total_blocks * COMPRESS_BLOCK_SIZE,
+                                            state={"output_size": dest.tell()})
+                        return False
+                    data = src.read(COMPRESS_BLOCK_SIZE)
+                    if data:
+                        in_flight.append(pool.submit(compress_block, data, self.fmt))
+                    # Stream finished blocks out in input order; drain everything at EOF
+                    while in_flight and (len(in_flight) >= window or not data):
+                        dest.write(in_flight.popleft().result())
+                        written += 1
+                        ctx.report(written, total_blocks, unit="blocks")
+                    if not data:
+                        break
+                if dest.tell() == 0:
+                    dest.write(compress_block(b"", self.fmt)) # Empty input still yields a valid file
+            finally:
+                for future in in_flight:
+                    future.cancel()
+        publish_output(dest_path, final_path)
+        return True
+
+class XzCompressProcessor(CompressProcessor):
+    name = "Compress (xz)"
+    fmt = "xz"
+    suffix = ".xz"
+
+# Checksums write "<digest>  <name>" next to the other outputs and checkpoint their
+# running state. A SHA-256 object cannot be serialized, so it resumes from memory within
+# a session and starts over after a restart; a CRC32 is a plain integer and is persisted.
+class ChecksumProcessor(FileProcessor):
+    name = "Checksum (SHA-256)"
+    suffix = ".sha256"
+    pipelined = True
+
+    def start(self, checkpoint):
+        if checkpoint and checkpoint["live"] is not None:
+            return checkpoint["offset"], checkpoint["live"]
+        return 0, hashlib.sha256()
+
+    def update(self, state, data):
+        state.update(data)
+        return state
+
+    def save(self, ctx, offset, size, state):
+        ctx.save_checkpoint(offset, size, live=state.copy())
+
+    def digest(self, state):
+        return state.hexdigest()
+
+    def run(self, ctx):
+        check_output_free(ctx.output_path(self.suffix)) # Fail before hashing, not after
+        size = os.path.getsize(ctx.file_path)
+        offset, state = self.start(ctx.checkpoint)
+        with ctx.open_source() as f:
+            f.seek(offset)
+            while True:
+                if ctx.should_stop():
+                    self.save(ctx, offset, size, state)
+                    return False
+                data = f.read(COPY_BUFFER_SIZE)
+                if not data:
+                    break
+                state = self.update(state, data)
+                offset += len(data)
+                ctx.report(offset, size, unit="bytes")
+        self.write_digest(ctx, state)
+        return True
+
+    def write_digest(self, ctx, state):
+        os.makedirs(ctx.output_dir, exist_ok=True)
+        dest = ctx.output_path(self.suffix)
+        check_output_free(dest)
+        with open(dest, "x", encoding="utf-8") as f:
+            f.write(f"{self.digest(state)}  {os.path.basename(ctx.file_path)}\n")
+
+    def open_sink(self, ctx):
+        check_output_free(ctx.output_path(self.suffix))
+        return DigestSink(self, ctx)
+
+class Crc32Processor(ChecksumProcessor):
+    name = "Checksum (CRC32)"
+    suffix = ".crc32"
+
+    def start(self, checkpoint):
+        if checkpoint and checkpoint["state"]:
+            return checkpoint["offset"], checkpoint["state"]["crc"]
+        return 0, 0
+
+    def update(self, state, data):
+        return zlib.crc32(data, state)
+
+    def save(self, ctx, offset, size, state):
+        ctx.save_checkpoint(offset, size, state={"crc": state})
+
+    def digest(self, state):
+        return f"{state:08x}"
+
+PROCESSORS = {cls.name: cls for cls in (SimulatedProcessor, CopyProcessor, MoveProcessor,
+                                         CompressProcessor, XzCompressProcessor,
+                                         ChecksumProcessor, Crc32Processor)}
+
+def run_processor_in_child(processor_name, file_path, output_dir, checkpoint, conn):
+    # Process backend, child side: progress and checkpoints go back over the pipe and a
+    # "stop" message from the parent is picked up by should_stop()
+    stop_requested = [False]
+
+    def should_stop():
+        while not stop_requested[0] and conn.poll():
+            stop_requested[0] = conn.recv() == "stop"
+        return stop_requested[0]
+
+    ctx = TaskContext(file_path, output_dir, should_stop,
+                      on_progress=lambda percent, detail: conn.send(("progress", percent, detail)),
+                      checkpoint=checkpoint,
+                      on_checkpoint=lambda offset, total, state, live: conn.send(("checkpoint", offset, total, state)))
+    try:
+        processor = PROCESSORS[processor_name]()
+        # Process CPU time, which also covers the child's own compression threads. Measured from
+        # here so spawn bootstrap and module imports are not charged to the task.
+        cpu_start = time.process_time()
+        finished = processor.run(ctx)
+        cpu = time.process_time() - cpu_start
+        # Peak memory is whole-process: the child only ever runs this one task
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+        conn.send(("accounting", {"cpu": cpu, "bytes_read": ctx.bytes_read, "peak_mem": peak}))
+        conn.send(("done", finished))
+    except Exception as e:
+        try:
+            conn.send(("error", e))
+        except Exception:
+            conn.send(("error", RuntimeError(repr(e)))) # Exception was not picklable
+
+def run_in_process(processor_name, ctx, run):
+    # Process backend, parent side: relays messages from the child until it finishes.
+    # run["process"] is set so a watchdog can kill the child.
+    # Live checkpoint state (hash objects) cannot cross the process boundary.
+    mp_context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = mp_context.Pipe()
+    checkpoint = dict(ctx.checkpoint, live=None) if ctx.checkpoint else None
+    process = mp_context.Process(target=run_processor_in_child,
+                                 args=(processor_name, ctx.file_path, ctx.output_dir, checkpoint, child_conn),
+                                 daemon=True)
+    process.start()
+    child_conn.close()
+    run["process"] = process
+    stop_sent = False
+    try:
+        while True:
+            if not stop_sent and ctx.should_stop():
+                parent_conn.send("stop")
+                stop_sent = True
+            try:
+                if not parent_conn.poll(0.1):
+                    if not process.is_alive():
+                        raise ChildProcessError(f"Worker process exited with code {process.exitcode}")
+                    continue
+                message = parent_conn.recv()
+            except (EOFError, OSError):
+                raise ChildProcessError(f"Worker process exited with code {process.exitcode}")
+            kind = message[0]
+            if kind == "progress":
+                ctx.on_progress(message[1], message[2])
+            elif kind == "checkpoint":
+                ctx.save_checkpoint(*message[1:])
+            elif kind == "accounting":
+                run["child_accounting"] = message[1]
+            elif kind == "done":
+                return message[1]
+            elif kind == "error":
+                raise message[1]
+    finally:
+        parent_conn.close()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+
+# --- Distributed Workers ---
+# Coordinator/worker mode. The app's queue stays the single source of truth; separate worker
+# processes (this file run with --worker ADDRESS, on this or other hosts sharing the same file
+# paths) connect over TCP or a Unix socket and speak newline-delimited JSON:
+#   worker -> coordinator: hello {name, slots}, heartbeat, progress/checkpoint/done/error {lease, ...}
+#   coordinator -> worker: welcome {heartbeat}, task {lease, path, processor, ...}, cancel {lease}
+# Each task runs under a lease held while the worker keeps in contact. A worker that disconnects
+# or misses heartbeats for REMOTE_LEASE_TIMEOUT loses its leases, and those tasks fail with
+# WorkerLostError (a ConnectionError, so the retry policy re-queues them). There is no
+# authentication: bind to loopback or a trusted network only.
+class WorkerLostError(ConnectionError):
+    pass
+
+class RemoteTaskError(Exception):
+    # A processor error raised on a worker node; transient follows classify_error() there
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+
+def parse_address(address):
+    # "unix:/path" (or any path with a slash) -> Unix socket; "host:port" -> TCP
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if "/" in address:
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+class JsonLineConnection:
+    def __init__(self, sock):
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def recv(self):
+        # Returns the next message, or None once the peer has closed the connection
+        line = self._reader.readline()
+        return json.loads(line) if line else None
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+class RemoteWorker:
+    def __init__(self, conn, name, slots):
+        self.conn = conn
+        self.name = name
+        self.slots = slots
+        self.leases = {} # lease id -> inbox queue of messages for the task running under it
+        self.last_seen = time.monotonic()
+        self.alive = True
+
+class Coordinator:
+    def __init__(self, address, lease_timeout=REMOTE_LEASE_TIMEOUT):
+        self.address = address
+        self.lease_timeout = lease_timeout
+        self.workers = []
+        self.held = 0 # Slots taken by the dispatcher and not yet released
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=REMOTE_MAX_TASKS, thread_name_prefix="remote-task")
+        self._cond = threading.Condition()
+        self._lease_counter = 0
+        self._server = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        family, target = parse_address(self.address)
+        server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(target):
+                os.remove(target) # Stale socket from an earlier run
+        else:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(target)
+        server.listen()
+        self._server = server
+        threading.Thread(target=self._accept_loop, daemon=True, name="coordinator-accept").start()
+        threading.Thread(target=self._monitor_loop, daemon=True, name="coordinator-monitor").start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._server:
+            try:
+                self._server.shutdown(socket.SHUT_RDWR) # Wakes the accept() thread; close() alone does not
+            except OSError:
+                pass
+            self._server.close()
+        for worker in list(self.workers):
+            self._drop(worker)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self):
+        # (workers, total slots, busy slots)
+        with self._cond:
+            return len(self.workers), sum(w.slots for w in self.workers), sum(len(w.leases) for w in self.workers)
+
+    # Slots: same acquire/release interface as the local threading.Semaphore
+
+    def acquire(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: sum(w.slots for w in self.workers) > self.held, timeout):
+                return False
+            self.held += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.held -= 1
+            self._cond.notify_all()
+
+    # Connections
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True, name="coordinator-conn").start()
+
+    def _serve(self, sock):
+        conn = JsonLineConnection(sock)
+        worker = None
+        try:
+            hello = conn.recv()
+            if not hello or hello.get("type") != "hello":
+                conn.close()
+                return
+            worker = RemoteWorker(conn, str(hello.get("name", "worker")), max(1, int(hello.get("slots", 1))))
+            conn.send({"type": "welcome", "heartbeat": REMOTE_HEARTBEAT})
+            with self._cond:
+                self.workers.append(worker)
+                self._cond.notify_all()
+            while True:
+                message = conn.recv()
+                if message is None:
+                    break
+                worker.last_seen = time.monotonic()
+                inbox = worker.leases.get(message.get("lease"))
+                if inbox is not None:
+                    inbox.put(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if worker:
+                self._drop(worker)
+            else:
+                conn.close()
 
-    def get(self, timeout=None):
-        priority_value, task_id, file_path = self._queue.get(timeout=timeout)
-        if file_path in self._items:
-            del self._items[file_path]
-        return file_path
+    def _drop(self, worker):
+        # Worker lost: every task it held fails with WorkerLostError
+        with self._cond:
+            if not worker.alive:
+                return
+            worker.alive = False
+            self.workers.remove(worker)
+            for inbox in worker.leases.values():
+                inbox.put({"type": "lost"})
+            self._cond.notify_all()
+        worker.conn.close()
 
-    def task_done(self):
-        self._queue.task_done()
-        
-    def empty(self):
-        return self._queue.empty()
-        
-    def contains(self, file_path):
-        return file_path in self._items
+    def _monitor_loop(self):
+        while not self._stopped.wait(REMOTE_HEARTBEAT):
+            now = time.monotonic()
+            for worker in list(self.workers):
+                if now - worker.last_seen > self.lease_timeout:
+                    self._drop(worker)
 
-    def _get_priority_value(self, priority_label):
-        # High=1, Medium=2, Low=3
-        return {"High": 1, "Medium": 2, "Low": 3}.get(priority_label, 2)
-        
-    def get_priority_label(self, priority_value):
-        # 1=High, 2=Medium, 3=Low
-        return {1: "High", 2: "Medium", 3: "Low"}.get(priority_value, "Medium")
-        
-    def get_all_paths(self):
-        return list(item[2] for item in self._queue.queue)
+    # Tasks
+
+    def run(self, processor_name, ctx, run):
+        # Remote backend: runs one task on a worker node and relays its messages, like run_in_process
+        inbox = queue.Queue()
+        with self._cond:
+            while True:
+                candidates = [w for w in self.workers if len(w.leases) < w.slots]
+                if candidates:
+                    break
+                if ctx.should_stop():
+                    return False
+                self._cond.wait(0.2)
+            worker = max(candidates, key=lambda w: w.slots - len(w.leases))
+            self._lease_counter += 1
+            lease = self._lease_counter
+            worker.leases[lease] = inbox
+        run["worker"] = worker.name
+        try:
+            try:
+                worker.conn.send({"type": "task", "lease": lease, "processor": processor_name, "path": ctx.file_path,
+                                  "output_dir": ctx.output_dir,
+                                  "checkpoint": dict(ctx.checkpoint, live=None) if ctx.checkpoint else None})
+            except OSError:
+                self._drop(worker)
+            cancel_sent = False
+            while True:
+                if not cancel_sent and ctx.should_stop():
+                    try:
+                        worker.conn.send({"type": "cancel", "lease": lease})
+                    except OSError:
+                        pass
+                    cancel_sent = True
+                try:
+                    message = inbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                kind = message["type"]
+                if kind == "progress":
+                    detail = message.get("detail")
+                    ctx.on_progress(message["percent"], tuple(detail) if detail else None)
+                elif kind == "checkpoint":
+                    ctx.save_checkpoint(message["offset"], message["total"], message.get("state"))
+                elif kind == "done":
+                    run["child_accounting"] = message.get("accounting")
+                    return message["finished"]
+                elif kind == "error":
+                    if message.get("errno") is not None:
+                        raise OSError(message["errno"], message["error"])
+                    raise RemoteTaskError(message["error"], message.get("transient", False))
+                elif kind == "lost":
+                    raise WorkerLostError(f"Worker {worker.name} was lost while running this task")
+        finally:
+            with self._cond:
+                worker.leases.pop(lease, None)
+                self._cond.notify_all()
+
+class WorkerNode:
+    # A worker process: runs tasks from a coordinator with `slots` threads, reconnecting if the
+    # coordinator goes away. Tasks running when the connection drops are stopped.
+    def __init__(self, address, slots=None, name=None):
+        self.address = address
+        self.slots = slots or os.cpu_count() or 1
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.cancel_events = {} # lease id -> threading.Event
+
+    def run_forever(self):
+        backoff = 1.0
+        while True:
+            family, target = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.connect(target)
+            except OSError as e:
+                sock.close()
+                print(f"[{self.name}] cannot reach coordinator at {self.address}: {e}; retrying in {backoff:.0f}s", file=sys.stderr)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 1.0
+            print(f"[{self.name}] connected to {self.address} with {self.slots} slots", file=sys.stderr)
+            self.serve(JsonLineConnection(sock))
+            print(f"[{self.name}] disconnected", file=sys.stderr)
+
+    def serve(self, conn):
+        connected = threading.Event()
+        connected.set()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="node-task")
+        try:
+            conn.send({"type": "hello", "name": self.name, "slots": self.slots})
+            welcome = conn.recv()
+            if not welcome:
+                return
+            threading.Thread(target=self._heartbeat_loop, args=(conn, connected, welcome.get("heartbeat", REMOTE_HEARTBEAT)),
+                             daemon=True).start()
+            while True:
+                message = conn.recv()
+                if message is None:
+                    break
+                if message["type"] == "task":
+                    self.cancel_events[message["lease"]] = threading.Event()
+                    executor.submit(self._run_task, conn, message)
+                elif message["type"] == "cancel":
+                    event = self.cancel_events.get(message["lease"])
+                    if event:
+                        event.set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            connected.clear()
+            for event in list(self.cancel_events.values()):
+                event.set() # Results can no longer be delivered; the coordinator re-queues these
+            executor.shutdown(wait=True)
+            conn.close()
+
+    def _heartbeat_loop(self, conn, connected, interval):
+        while connected.is_set():
+            time.sleep(interval)
+            try:
+                conn.send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    def _run_task(self, conn, task):
+        lease = task["lease"]
+        stop = self.cancel_events[lease]
+
+        def send(message):
+            try:
+                conn.send(dict(message, lease=lease))
+            except OSError:
+                stop.set()
+
+        ctx = TaskContext(task["path"], task["output_dir"], stop.is_set,
+                          on_progress=lambda percent, detail: send({"type": "progress", "percent": percent, "detail": detail}),
+                          checkpoint=task.get("checkpoint"),
+                          on_checkpoint=lambda offset, total, state, live: send({"type": "checkpoint", "offset": offset,
+                                                                                 "total": total, "state": state}))
+        cpu_start = time.thread_time()
+        try:
+            finished = PROCESSORS[task["processor"]]().run(ctx)
+            send({"type": "done", "finished": finished,
+                  "accounting": {"cpu": time.thread_time() - cpu_start, "bytes_read": ctx.bytes_read, "peak_mem": None}})
+        except Exception as e:
+            send({"type": "error", "error": f"{type(e).__name__}: {e}", "errno": getattr(e, "errno", None),
+                  "transient": classify_error(e) == "transient"})
+        finally:
+            self.cancel_events.pop(lease, None)
+
+def format_file_size(size_bytes):
+    if size_bytes == 0: return "0 B"
+    size_name = ("B", "KB", "MB", "GB", "TB")
+    i = 0
+    while size_bytes >= 1024 and i < len(size_name) - 1:
+        size_bytes /= 1024
+        i += 1
+    return f"{size_bytes:,.1f} {size_name[i]}"
 
 class TaskManagerApp:
     def __init__(self, root, num_workers=4):
+        self.init_started = time.perf_counter()
+        self.startup_seconds = None # Set once the window has been drawn (tracked by the benchmarks)
         self.root = root
         self.root.title("File Queue Task Manager (Advanced)")
 
         self.file_queue = PriorityQueue() # Use custom PriorityQueue
+        self.task_graph = TaskGraph()     # Dependencies between queued tasks
+        self.checkpoints = CheckpointStore() # Resume points for interrupted tasks
+        self.retry_policy = RetryPolicy()
+        self.retry_queue = DelayQueue()   # Transient failures wait here, not in a worker
+        self.metrics = MetricsRecorder()
+        self.accountant = ResourceAccountant()
+        self.tracer = TraceRecorder()
+        self.profiler = ProcessorProfiler()
         self.running = False
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+        # Twice the worker count: spare threads replace ones left hung by timed-out tasks
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_workers * 2, thread_name_prefix="task-worker")
         self.task_rows = {}          # file_path -> row_id
         self.task_metadata = {}      # file_path -> {"id", "start", "priority", "size", "modified"}
         self.task_counter = 0
@@ -68,11 +2228,36 @@ class TaskManagerApp:
         self.paused_tasks = {}       # file_path -> True if paused
         self.canceled_tasks = {}     # file_path -> True if canceled
 
+        self.pipeline = None         # Active Pipeline when running in pipeline mode
+        self.active_futures = set()  # Executor futures of tasks currently being processed
+
+        # Execution slots and timeouts
+        self.local_slots = threading.Semaphore(num_workers) # One per task allowed to run at once
+        self.slots = self.local_slots # The coordinator's remote slots when the Remote backend is on
+        self.coordinator = None
+        self.running_tasks = {}      # file_path -> run record (deadline, process, slot state)
+        self.running_lock = threading.Lock()
+        self.priority_timeouts = {}  # priority -> seconds, 0 = no limit
+        self.backend = "Threads"
+        self.history = HistoryStore()
+        self.history_page = 0
+        self.history_sort = ("completed", True) # (column, descending): newest first
+        self.history_refresh_pending = False
+        self.history_export = None
+        self.watcher = None
+
         self.setup_ui()
         self.configure_styles()
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_exit)
 
+        threading.Thread(target=self.watchdog_loop, daemon=True).start()
+        self.refresh_metrics()
+        self.root.after_idle(self.mark_ready)
+
+    def mark_ready(self):
+        self.startup_seconds = time.perf_counter() - self.init_started
+
     # --- UI & Style Configuration ---
     
     def configure_styles(self):
@@ -84,33 +2269,42 @@ class TaskManagerApp:
         self.task_table.tag_configure('paused', foreground='#ff8c00', font='Arial 8') # Orange for Paused
         self.task_table.tag_configure('completed', foreground='green', font='Arial 8 bold') # Green for Completed
         self.task_table.tag_configure('failed', foreground='red', font='Arial 8 bold') # Red for Failed
+        self.task_table.tag_configure('retrying', foreground='#8a2be2', font='Arial 8') # Purple while waiting to retry
+        self.task_table.tag_configure('timedout', foreground='#b22222', font='Arial 8 bold') # Dark red for Timed Out
 
-        # Custom progress bar aesthetic (same as before)
+        # Progress styles are created on first use (see progress_tag), not all up front
         self.progress_styles = {}
-        for i in range(101):
-            tag_name = f"progress_{i}"
-            progress_width = int(i / 100.0 * 1000)
 
-            progress_color = '#a6e3a6'
-            background_color = '#e5e5e5'
+    def progress_tag(self, value):
+        # Quantized to PROGRESS_STEP buckets; each bucket's style and tag is built once and cached
+        bucket = 100 if value >= 100 else max(0, value - value % PROGRESS_STEP)
+        tag_name = self.progress_styles.get(bucket)
+        if tag_name is not None:
+            return tag_name
+        tag_name = f"progress_{bucket}"
+        progress_width = int(bucket / 100.0 * 1000)
 
-            if i == 100:
-                self.style.configure(tag_name, 
-                                     fieldbackground=[("selected", "SystemHighlight"), ("!selected", "green")], 
-                                     foreground=[("selected", "white"), ("!selected", "black")])
-            else:
-                self.style.configure(tag_name, 
-                                     fieldbackground=[
-                                         ("selected", "SystemHighlight"), 
-                                         ("!selected", 
-                                          [('progress_bg.Tredge', 0, progress_width, progress_color), 
-                                           ('progress_bg.Tredge', progress_width, 1000, background_color)]
-                                         )
-                                     ], 
-                                     foreground=[("selected", "white"), ("!selected", "black")])
-            
-            self.task_table.tag_configure(tag_name, background="", font='Arial 8 bold')
-            self.progress_styles[i] = tag_name
+        progress_color = '#a6e3a6'
+        background_color = '#e5e5e5'
+
+        if bucket == 100:
+            self.style.configure(tag_name, 
+                                 fieldbackground=[("selected", "SystemHighlight"), ("!selected", "green")], 
+                                 foreground=[("selected", "white"), ("!selected", "black")])
+        else:
+            self.style.configure(tag_name, 
+                                 fieldbackground=[
+                                     ("selected", "SystemHighlight"), 
+                                     ("!selected", 
+                                      [('progress_bg.Tredge', 0, progress_width, progress_color), 
+                                       ('progress_bg.Tredge', progress_width, 1000, background_color)]
+                                     )
+                                 ], 
+                                 foreground=[("selected", "white"), ("!selected", "black")])
+        
+        self.task_table.tag_configure(tag_name, background="", font='Arial 8 bold')
+        self.progress_styles[bucket] = tag_name
+        return tag_name
 
     def setup_ui(self):
         self.root.rowconfigure(0, weight=1)
@@ -141,6 +2335,50 @@ class TaskManagerApp:
         self.recursive_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(settings_frame, text="Recursive Search", variable=self.recursive_var).grid(row=0, column=4, padx=(20, 5), pady=2, sticky="w")
 
+        # Processor Selector (applied to files as they are added)
+        ttk.Label(settings_frame, text="Processor:").grid(row=0, column=5, padx=5, pady=2, sticky="w")
+        self.processor_var = tk.StringVar(value="Simulate")
+        ttk.Combobox(settings_frame, textvariable=self.processor_var,
+                     values=list(PROCESSORS), state="readonly", width=16).grid(row=0, column=6, padx=5, pady=2, sticky="w")
+
+        # Output Folder (used by processors that write results)
+        ttk.Label(settings_frame, text="Output Folder:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.output_dir = tk.StringVar(value=os.path.abspath("output"))
+        ttk.Entry(settings_frame, textvariable=self.output_dir, width=40).grid(row=1, column=1, columnspan=2, padx=5, pady=2, sticky="ew")
+        ttk.Button(settings_frame, text="Browse", command=self.choose_output_dir).grid(row=1, column=3, padx=5, pady=2, sticky="w")
+
+        # Pipeline Mode: read -> transform -> write over fixed-size chunks, with a worker count per stage
+        self.pipeline_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="Pipeline Mode", variable=self.pipeline_var).grid(row=1, column=4, padx=(20, 5), pady=2, sticky="w")
+        ttk.Label(settings_frame, text="Stage Workers (read/transform/write):").grid(row=1, column=5, padx=5, pady=2, sticky="w")
+        self.stage_workers = tk.StringVar(value="2/4/1")
+        ttk.Entry(settings_frame, textvariable=self.stage_workers, width=8).grid(row=1, column=6, padx=5, pady=2, sticky="w")
+
+        # Retries for transient errors (locked files, EAGAIN, stale mounts)
+        ttk.Label(settings_frame, text="Max Retries:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.max_retries_var = tk.StringVar(value="3")
+        ttk.Spinbox(settings_frame, from_=0, to=10, textvariable=self.max_retries_var, width=5).grid(row=2, column=1, padx=5, pady=2, sticky="w")
+
+        # Per-priority timeouts in seconds (0 = no limit); per-task limits override them
+        ttk.Label(settings_frame, text="Timeouts s (High/Medium/Low):").grid(row=2, column=2, padx=(20, 5), pady=2, sticky="w")
+        self.priority_timeouts_var = tk.StringVar(value="0/0/0")
+        ttk.Entry(settings_frame, textvariable=self.priority_timeouts_var, width=12).grid(row=2, column=3, padx=5, pady=2, sticky="w")
+
+        # Resource accounting (CPU time, bytes read, sampled peak memory) per task
+        self.accounting_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(settings_frame, text="Resource Accounting", variable=self.accounting_var).grid(row=2, column=4, padx=(20, 5), pady=2, sticky="w")
+
+        # Backend: processes isolate each task so a hung one can be killed
+        ttk.Label(settings_frame, text="Backend:").grid(row=2, column=5, padx=5, pady=2, sticky="w")
+        self.backend_var = tk.StringVar(value="Threads")
+        ttk.Combobox(settings_frame, textvariable=self.backend_var, values=["Threads", "Processes", "Remote"],
+                     state="readonly", width=10).grid(row=2, column=6, padx=5, pady=2, sticky="w")
+
+        # Remote backend: worker nodes (task_queue.py --worker ADDRESS) connect to this address
+        ttk.Label(settings_frame, text="Coordinator Address:").grid(row=3, column=0, padx=5, pady=2, sticky="w")
+        self.coordinator_address = tk.StringVar(value="127.0.0.1:7878")
+        ttk.Entry(settings_frame, textvariable=self.coordinator_address, width=25).grid(row=3, column=1, columnspan=2, padx=5, pady=2, sticky="w")
+
         # --- Controls Frame (Row 1) ---
         controls = ttk.Frame(frame)
         controls.grid(row=1, column=0, sticky="ew", pady=(0, 10), columnspan=2)
@@ -148,21 +2386,29 @@ class TaskManagerApp:
         # File/Folder Buttons
         ttk.Button(controls, text="➕ Add File", command=self.add_file).grid(row=0, column=0, padx=5)
         ttk.Button(controls, text="📁 Add Folder", command=self.add_folder).grid(row=0, column=1, padx=5)
+        ttk.Button(controls, text="🔗 Add Dependent", command=self.add_dependent_files).grid(row=0, column=2, padx=5)
         
         # Action Buttons (Start/Stop, Clear)
         self.start_stop_button = ttk.Button(controls, text="▶️ Start Queue", command=self.toggle_workers, style='TButton', width=15)
-        self.start_stop_button.grid(row=0, column=2, padx=(20, 5))
+        self.start_stop_button.grid(row=0, column=3, padx=(20, 5))
         
-        ttk.Button(controls, text="⏸️ Pause Selected", command=lambda: self.control_task("Pause")).grid(row=0, column=3, padx=5)
-        ttk.Button(controls, text="▶️ Resume Selected", command=lambda: self.control_task("Resume")).grid(row=0, column=4, padx=5)
-        ttk.Button(controls, text="🛑 Cancel Selected", command=lambda: self.control_task("Cancel")).grid(row=0, column=5, padx=5)
+        ttk.Button(controls, text="⏸️ Pause Selected", command=lambda: self.control_task("Pause")).grid(row=0, column=4, padx=5)
+        ttk.Button(controls, text="▶️ Resume Selected", command=lambda: self.control_task("Resume")).grid(row=0, column=5, padx=5)
+        ttk.Button(controls, text="🛑 Cancel Selected", command=lambda: self.control_task("Cancel")).grid(row=0, column=6, padx=5)
 
-        ttk.Button(controls, text="🗑️ Clear Queue", command=self.clear_queue).grid(row=0, column=6, padx=(20, 5))
-        ttk.Button(controls, text="❌ Exit Safely", command=self.on_exit).grid(row=0, column=7, padx=5)
+        ttk.Button(controls, text="🗑️ Clear Queue", command=self.clear_queue).grid(row=0, column=7, padx=(20, 5))
+        ttk.Button(controls, text="❌ Exit Safely", command=self.on_exit).grid(row=0, column=8, padx=5)
+        ttk.Button(controls, text="⏱️ Set Timeout", command=self.set_task_timeout).grid(row=0, column=9, padx=5)
+        self.watch_button = ttk.Button(controls, text="👁️ Watch Folder", command=self.toggle_watch)
+        self.watch_button.grid(row=0, column=10, padx=5)
         
         # --- Notebook (Tabs) (Row 2) ---
         self.notebook = ttk.Notebook(frame)
         self.notebook.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=5)
+
+        # --- Pipeline Utilization (Row 3) ---
+        self.pipeline_status = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.pipeline_status, foreground="gray").grid(row=3, column=0, columnspan=2, sticky="w")
         
         # --- Task Tab ---
         task_tab = ttk.Frame(self.notebook)
@@ -193,35 +2439,104 @@ class TaskManagerApp:
 
         # --- History Tab ---
         history_tab = ttk.Frame(self.notebook)
-        history_tab.grid_rowconfigure(0, weight=1)
+        history_tab.grid_rowconfigure(1, weight=1)
         history_tab.grid_columnconfigure(0, weight=1)
         self.notebook.add(history_tab, text="✅ History")
+
+        # Filters and paging (rows come from the on-disk HistoryStore one page at a time)
+        history_controls = ttk.Frame(history_tab)
+        history_controls.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        ttk.Label(history_controls, text="Status:").pack(side="left", padx=(0, 5))
+        self.history_status_filter = tk.StringVar(value="All")
+        status_combo = ttk.Combobox(history_controls, textvariable=self.history_status_filter, state="readonly", width=12,
+                                    values=["All", "Completed", "Failed", "Canceled", "Timed Out"])
+        status_combo.pack(side="left")
+        status_combo.bind("<<ComboboxSelected>>", lambda e: self.load_history_page(0))
+        ttk.Label(history_controls, text="Priority:").pack(side="left", padx=(15, 5))
+        self.history_priority_filter = tk.StringVar(value="All")
+        priority_combo = ttk.Combobox(history_controls, textvariable=self.history_priority_filter, state="readonly", width=10,
+                                      values=["All", "High", "Medium", "Low"])
+        priority_combo.pack(side="left")
+        priority_combo.bind("<<ComboboxSelected>>", lambda e: self.load_history_page(0))
+        ttk.Button(history_controls, text="Next ▶", command=lambda: self.load_history_page(self.history_page + 1)).pack(side="right", padx=5)
+        self.history_page_label = tk.StringVar(value="")
+        ttk.Label(history_controls, textvariable=self.history_page_label).pack(side="right", padx=5)
+        ttk.Button(history_controls, text="◀ Prev", command=lambda: self.load_history_page(self.history_page - 1)).pack(side="right", padx=5)
         
         # ADDED DURATION AND PRIORITY TO HISTORY
-        self.history_table = ttk.Treeview(history_tab, columns=("id", "file", "priority", "completed", "duration", "status"), show="headings", height=15)
+        self.history_table = ttk.Treeview(history_tab, columns=("id", "file", "priority", "completed", "duration", "wait", "processing", "cpu", "read", "peak_mem", "status"), show="headings", height=15)
         
-        history_cols = {"id": 60, "file": 350, "priority": 80, "completed": 150, "duration": 100, "status": 100}
+        # duration = added -> finished; wait = queued -> started; processing = started -> finished
+        # cpu (s), read (bytes) and peak_mem (bytes) come from resource accounting when enabled
+        history_cols = {"id": 60, "file": 350, "priority": 80, "completed": 150, "duration": 100, "wait": 80, "processing": 90,
+                        "cpu": 70, "read": 100, "peak_mem": 100, "status": 100}
         for col, width in history_cols.items():
-            heading_text = col.title().replace('Id', 'ID')
-            self.history_table.heading(col, text=heading_text, command=lambda _col=col: self.treeview_sort_column(self.history_table, _col, False))
+            heading_text = {"cpu": "CPU (s)", "read": "Read (B)", "peak_mem": "Peak Mem (B)"}.get(col, col.title().replace('Id', 'ID'))
+            self.history_table.heading(col, text=heading_text, command=lambda _col=col: self.sort_history(_col))
             self.history_table.column(col, width=width, anchor="w")
             
         self.history_table.column("id", anchor="center")
         self.history_table.column("priority", anchor="center")
         self.history_table.column("duration", anchor="center")
+        self.history_table.column("wait", anchor="center")
+        self.history_table.column("processing", anchor="center")
         self.history_table.column("status", anchor="center")
         
-        self.history_table.grid(row=0, column=0, sticky="nsew")
+        self.history_table.grid(row=1, column=0, sticky="nsew")
         self.history_table.bind("<Double-1>", lambda e: self.on_header_double_click(e, self.history_table))
         
         history_scroll = ttk.Scrollbar(history_tab, orient="vertical", command=self.history_table.yview)
-        history_scroll.grid(row=0, column=1, sticky="ns")
+        history_scroll.grid(row=1, column=1, sticky="ns")
         self.history_table.configure(yscrollcommand=history_scroll.set)
 
-        export_button = ttk.Button(history_tab, text="💾 Export History to CSV", command=self.export_history)
-        export_button.grid(row=1, column=0, columnspan=2, pady=5, sticky="e")
+        self.history_summary = tk.StringVar(value="")
+        ttk.Label(history_tab, textvariable=self.history_summary).grid(row=2, column=0, pady=5, sticky="w")
+
+        export_frame = ttk.Frame(history_tab)
+        export_frame.grid(row=2, column=0, columnspan=2, pady=5, sticky="e")
+        self.export_status = tk.StringVar(value="")
+        ttk.Label(export_frame, textvariable=self.export_status).pack(side="left", padx=5)
+        self.export_progress = ttk.Progressbar(export_frame, orient="horizontal", mode="determinate", length=150)
+        self.export_progress.pack(side="left", padx=5)
+        self.export_button = ttk.Button(export_frame, text="💾 Export History", command=self.export_history)
+        self.export_button.pack(side="left")
         
-        self.autofit_columns(self.history_table)
+        self.load_history_page(0, autofit=True)
+
+        # --- Metrics Tab ---
+        metrics_tab = ttk.Frame(self.notebook)
+        metrics_tab.grid_rowconfigure(1, weight=1)
+        metrics_tab.grid_columnconfigure(0, weight=1)
+        self.notebook.add(metrics_tab, text="📊 Metrics")
+
+        self.throughput_var = tk.StringVar(value="")
+        ttk.Label(metrics_tab, textvariable=self.throughput_var).grid(row=0, column=0, pady=5, sticky="w")
+
+        metric_cols = {"priority": 80, "count": 70, "wait_p50": 90, "wait_p90": 90, "wait_p99": 90,
+                       "proc_p50": 90, "proc_p90": 90, "proc_p99": 90, "proc_max": 90}
+        self.metrics_table = ttk.Treeview(metrics_tab, columns=tuple(metric_cols), show="headings", height=4)
+        for col, width in metric_cols.items():
+            heading_text = col.replace("proc_", "Processing ").replace("wait_", "Wait ").title()
+            self.metrics_table.heading(col, text=heading_text)
+            self.metrics_table.column(col, width=width, anchor="center")
+        self.metrics_table.grid(row=1, column=0, sticky="nsew")
+
+        metrics_buttons = ttk.Frame(metrics_tab)
+        metrics_buttons.grid(row=2, column=0, pady=5, sticky="ew")
+        self.trace_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(metrics_buttons, text="Record Trace", variable=self.trace_var,
+                        command=lambda: setattr(self.tracer, "enabled", self.trace_var.get())).pack(side="left", padx=5)
+        ttk.Button(metrics_buttons, text="🧵 Export Trace", command=self.export_trace).pack(side="left", padx=5)
+
+        # Profiling (thread backend): cProfile around a fraction of processor calls
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_fraction = tk.StringVar(value="0.1")
+        ttk.Checkbutton(metrics_buttons, text="Profile Fraction:", variable=self.profile_var,
+                        command=self.toggle_profiling).pack(side="left", padx=(20, 5))
+        ttk.Entry(metrics_buttons, textvariable=self.profile_fraction, width=5).pack(side="left")
+        ttk.Button(metrics_buttons, text="🔬 Show Profiles", command=self.show_profiles).pack(side="left", padx=5)
+        ttk.Button(metrics_buttons, text="💾 Dump pstats", command=self.dump_profiles).pack(side="left", padx=5)
+        ttk.Button(metrics_buttons, text="💾 Dump Prometheus Metrics", command=self.export_metrics).pack(side="right", padx=5)
 
     # --- Worker Management ---
     
@@ -229,15 +2544,34 @@ class TaskManagerApp:
 
     def start_workers(self):
         if not self.running:
+            try:
+                high, medium, low = (float(n) for n in self.priority_timeouts_var.get().split("/"))
+            except ValueError:
+                messagebox.showerror("Error", "Timeouts must look like 60/300/0 (High/Medium/Low, 0 = none).")
+                return
+            self.priority_timeouts = {"High": high, "Medium": medium, "Low": low}
+            self.backend = self.backend_var.get()
+            self.accountant.enabled = self.accounting_var.get()
+            if self.backend == "Remote" and not self.start_coordinator():
+                return
+            self.slots = self.coordinator if self.backend == "Remote" else self.local_slots
+
+            if self.pipeline_var.get():
+                try:
+                    self.pipeline = self.build_pipeline()
+                except ValueError:
+                    messagebox.showerror("Error", "Stage workers must look like 2/4/1 (read/transform/write).")
+                    return
+
             self.running = True
             self.stop_event.clear()
             if self.executor._shutdown:
-                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) 
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers * 2, thread_name_prefix="task-worker")
                 
             self.worker_threads.clear()
             
-            for _ in range(self.num_workers):
-                t = threading.Thread(target=self.worker_loop, daemon=True)
+            for i in range(self.num_workers):
+                t = threading.Thread(target=self.worker_loop, daemon=True, name=f"dispatcher-{i}")
                 t.start()
                 self.worker_threads.append(t)
             
@@ -245,12 +2579,21 @@ class TaskManagerApp:
             for file_path in list(self.paused_tasks.keys()):
                 self.root.after(0, lambda fp=file_path: self.control_task_internal(fp, "Resume"))
                 
+            if self.pipeline:
+                self.pipeline.start()
+                self.refresh_pipeline_status(self.pipeline)
+
             self.start_stop_button.config(text="⏸️ Stop Queue")
 
     def stop_workers(self):
         if self.running:
             self.running = False
             self.stop_event.set()
+
+            if self.pipeline:
+                for item in self.pipeline.stop():
+                    self.pipeline_drop(item)
+                self.pipeline = None
             
             self.root.after(0, self.update_queued_to_paused)
             
@@ -283,6 +2626,7 @@ class TaskManagerApp:
         # Clear all control dictionaries
         self.paused_tasks.clear()
         self.canceled_tasks.clear()
+        self.task_graph.clear()
 
         # Clear the internal queue
         for path in self.file_queue.get_all_paths():
@@ -301,22 +2645,18 @@ class TaskManagerApp:
 
     # --- Task Control (Pause/Resume/Cancel) ---
 
+    def selected_paths(self):
+        row_to_path = {row_id: file_path for file_path, row_id in self.task_rows.items()}
+        return [row_to_path[item_id] for item_id in self.task_table.selection() if item_id in row_to_path]
+
     def control_task(self, action):
-        selected_items = self.task_table.selection()
-        if not selected_items:
+        selected_paths = self.selected_paths()
+        if not selected_paths:
             messagebox.showinfo("Selection Error", "Please select one or more tasks.")
             return
 
-        for item_id in selected_items:
-            # Get the full file path from the metadata based on row_id
-            vals = self.task_table.item(item_id, "values")
-            file_name = vals[1] 
-            
-            # Find the file_path from task_rows
-            file_path = next((k for k, v in self.task_rows.items() if v == item_id and os.path.basename(k) == file_name), None)
-            
-            if file_path:
-                self.control_task_internal(file_path, action)
+        for file_path in selected_paths:
+            self.control_task_internal(file_path, action)
 
     def control_task_internal(self, file_path, action):
         row_id = self.task_rows.get(file_path)
@@ -330,12 +2670,14 @@ class TaskManagerApp:
         elif action == "Resume":
             if file_path in self.paused_tasks and file_path not in self.canceled_tasks:
                 del self.paused_tasks[file_path]
+
+                # Tasks still blocked on dependencies go back to waiting instead of the queue
+                if self.task_graph.is_waiting(file_path):
+                    self.update_status(file_path, "Waiting")
+                    return
+
                 self.update_status(file_path, "Queued")
-                
-                # Re-add to the priority queue
-                priority = self.task_metadata[file_path]["priority"]
-                task_id = self.task_metadata[file_path]["id"]
-                self.file_queue.put(file_path, priority, task_id)
+                self.enqueue_task(file_path)
         
         elif action == "Cancel":
             # If still in queue, remove it instantly
@@ -364,17 +2706,54 @@ class TaskManagerApp:
         if folder_path:
             is_recursive = self.recursive_var.get()
             extensions = [ext.strip().lower() for ext in self.file_filter.get().split(',') if ext.strip()]
+            output_dir = os.path.abspath(self.output_dir.get())
             
             if is_recursive:
-                for root, _, files in os.walk(folder_path):
+                for root, dirs, files in os.walk(folder_path):
+                    if os.path.abspath(root) == output_dir:
+                        continue
+                    # Never pick up our own outputs, as the watcher and headless runner skip them too
+                    dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_dir]
                     for entry in files:
                         file_path = os.path.join(root, entry)
                         self.check_and_add_file(file_path, priority, extensions)
-            else:
+            elif os.path.abspath(folder_path) != output_dir:
                 for entry in os.listdir(folder_path):
                     file_path = os.path.join(folder_path, entry)
                     if os.path.isfile(file_path):
                         self.check_and_add_file(file_path, priority, extensions)
+
+    def toggle_watch(self):
+        if self.watcher:
+            # stop() waits for the watcher thread, which may itself be waiting on Tk to deliver files
+            threading.Thread(target=self.watcher.stop, daemon=True).start()
+            self.watcher = None
+            self.watch_button.config(text="👁️ Watch Folder")
+            return
+        folder_path = filedialog.askdirectory(title="Select Folder to Watch")
+        if not folder_path:
+            return
+        self.watcher = FolderWatcher(folder_path, lambda paths: self.root.after(0, self.add_watched_files, paths),
+                                     recursive=self.recursive_var.get(), ignore=[self.output_dir.get()])
+        self.watcher.start()
+        self.watch_button.config(text=f"⏹️ Stop Watching ({self.watcher.mode})")
+
+    def add_watched_files(self, paths):
+        # Settled new/modified files from the watcher; filter and priority are read at enqueue time
+        priority = self.default_priority.get()
+        extensions = [ext.strip().lower() for ext in self.file_filter.get().split(',') if ext.strip()]
+        for file_path in paths:
+            self.check_and_add_file(file_path, priority, extensions)
+
+    def add_dependent_files(self):
+        # New files run only after every selected task has completed
+        parents = self.selected_paths()
+        if not parents:
+            messagebox.showinfo("Selection Error", "Select the tasks the new files depend on.")
+            return
+        priority = self.default_priority.get()
+        for file_path in filedialog.askopenfilenames(title="Select Dependent Files"):
+            self.add_task_to_queue(file_path, priority, parents=parents)
                         
     def check_and_add_file(self, file_path, priority, extensions):
         if file_path in self.task_rows: return
@@ -386,7 +2765,7 @@ class TaskManagerApp:
                 
         self.add_task_to_queue(file_path, priority)
 
-    def add_task_to_queue(self, file_path, priority):
+    def add_task_to_queue(self, file_path, priority, parents=()):
         if file_path in self.task_rows:
             messagebox.showinfo("Duplicate", f"File already in queue: {os.path.basename(file_path)}")
             return
@@ -405,11 +2784,13 @@ class TaskManagerApp:
             modified_date = "N/A"
             
         file_size_str = self.format_file_size(file_size)
+        state = self.task_graph.add(file_path, parents, cost=file_size)
+        status = {"ready": "Queued", "waiting": "Waiting", "canceled": "Canceled"}[state]
 
         # Insert into UI
         row_id = self.task_table.insert("", tk.END, 
-                                        values=(task_id, os.path.basename(file_path), priority, file_size_str, modified_date, "Queued", "0%", started.strftime("%Y-%m-%d %H:%M:%S")),
-                                        tags=('queued', 'progress_0'))
+                                        values=(task_id, os.path.basename(file_path), priority, file_size_str, modified_date, status, "0%", started.strftime("%Y-%m-%d %H:%M:%S")),
+                                        tags=('queued', self.progress_tag(0)))
         
         # Store metadata
         self.task_rows[file_path] = row_id
@@ -418,29 +2799,64 @@ class TaskManagerApp:
             "start": started, 
             "priority": priority, 
             "size": file_size_str, 
-            "modified": modified_date
+            "modified": modified_date,
+            "size_bytes": file_size,
+            "processor": self.processor_var.get(),
+            "output_dir": self.output_dir.get(),
         }
         
-        # Put into Priority Queue
-        self.file_queue.put(file_path, priority, task_id)
+        # Show progress already saved by an earlier run of this file
+        checkpoint = self.checkpoints.get(file_path, self.task_metadata[file_path]["processor"])
+        if checkpoint:
+            self.update_progress(file_path, checkpoint["percent"])
+
+        # Put into Priority Queue (dependents wait until their parents complete)
+        if state == "ready":
+            self.enqueue_task(file_path)
+        elif state == "canceled":
+            # A parent already failed or was canceled, like the dependents that were there at the time
+            self.finish_task(file_path, "Canceled")
+
+    def enqueue_task(self, file_path):
+        metadata = self.task_metadata[file_path]
+        metadata["enqueued_at"] = time.monotonic()
+        self.file_queue.put(file_path, metadata["priority"], metadata["id"], rank=self.task_graph.rank(file_path))
+        self.tracer.instant("enqueue", cat="queue", args={"file": os.path.basename(file_path), "priority": metadata["priority"]})
+        self.tracer.counter("queue depth", {"queued": self.file_queue.qsize()})
+
+    def release_dependents(self, file_path, status):
+        # Completion unblocks children; any other outcome cancels everything downstream
+        if status == "Completed":
+            for child in self.task_graph.complete(file_path):
+                if child in self.task_rows and child not in self.paused_tasks:
+                    self.update_status(child, "Queued")
+                    self.enqueue_task(child)
+        else:
+            for child in self.task_graph.fail(file_path):
+                self.finish_task(child, "Canceled")
         
     def format_file_size(self, size_bytes):
-        if size_bytes == 0: return "0 B"
-        size_name = ("B", "KB", "MB", "GB", "TB")
-        i = 0
-        while size_bytes >= 1024 and i < len(size_name) - 1:
-            size_bytes /= 1024
-            i += 1
-        return f"{size_bytes:,.1f} {size_name[i]}"
+        return format_file_size(size_bytes)
 
 
     # --- Task Execution Logic ---
 
     def worker_loop(self):
         while self.running:
+            # Take a free slot before taking work, so tasks wait in the priority queue (where
+            # priorities and pauses still apply) until something can actually run them
+            uses_slot = self.pipeline is None
+            wait_start = self.tracer.now()
+            if uses_slot and not self.slots.acquire(timeout=0.1):
+                continue
+            if uses_slot:
+                self.tracer.complete("wait for slot", wait_start, cat="dispatch")
+            dispatched = False
             try:
                 # Use PriorityQueue get
+                get_start = self.tracer.now()
                 file_path = self.file_queue.get(timeout=0.1)
+                self.tracer.complete("queue.get", get_start, cat="dispatch", args={"file": os.path.basename(file_path)})
                 
                 if not self.running:
                     self.file_queue.put(file_path, "Medium", 0) # Put back
@@ -453,41 +2869,390 @@ class TaskManagerApp:
                 
                 if file_path in self.paused_tasks:
                     # Put the item back into the queue for next worker/resume, and mark task done for queue count
-                    priority = self.task_metadata[file_path]["priority"]
-                    task_id = self.task_metadata[file_path]["id"]
-                    self.file_queue.put(file_path, priority, task_id)
+                    self.enqueue_task(file_path)
                     self.file_queue.task_done()
                     continue
                     
-                self.executor.submit(self.process_file, file_path)
+                if self.pipeline and PROCESSORS[self.task_metadata[file_path]["processor"]].pipelined:
+                    self.submit_to_pipeline(self.pipeline, file_path)
+                else:
+                    # Pipeline mode only skips the slot for tasks the pipeline runs; processors
+                    # without a chunked form still count against the worker limit
+                    while not uses_slot and self.running:
+                        uses_slot = self.slots.acquire(timeout=0.1)
+                    if not uses_slot:
+                        self.enqueue_task(file_path) # Stopped while waiting; leave it queued
+                        self.file_queue.task_done()
+                        continue
+                    # Remote tasks only wait on a worker node, so they get the coordinator's larger pool
+                    executor = self.coordinator.executor if self.slots is self.coordinator else self.executor
+                    future = executor.submit(self.process_file, file_path)
+                    dispatched = True
+                    self.active_futures.add(future)
+                    future.add_done_callback(self.active_futures.discard)
                 self.file_queue.task_done()
                 
             except queue.Empty:
                 if self.stop_event.is_set():
                     break
                 continue
+
+            finally:
+                if uses_slot and not dispatched:
+                    self.slots.release()
                 
     def process_file(self, file_path):
-        if not self.running or file_path in self.canceled_tasks or file_path in self.paused_tasks:
-            self.root.after(0, lambda: self.update_status(file_path, "Paused" if file_path in self.paused_tasks else "Queued"))
-            return
-
+        run = self.begin_run(file_path)
         try:
+            if not self.running or file_path in self.canceled_tasks or file_path in self.paused_tasks:
+                self.root.after(0, lambda: self.update_status(file_path, "Paused" if file_path in self.paused_tasks else "Queued"))
+                return
+
             self.root.after(0, lambda: self.update_status(file_path, "Processing"))
-            
-            # Simulated work
-            for i in range(1, 101):
-                if not self.running or file_path in self.canceled_tasks or file_path in self.paused_tasks:
-                    self.root.after(0, lambda: self.update_status(file_path, "Paused" if file_path in self.paused_tasks else "Cancelling..."))
-                    return
-                    
-                time.sleep(0.02)
-                self.root.after(0, lambda val=i: self.update_progress(file_path, val))
+
+            metadata = self.task_metadata[file_path]
+            metadata["started_at"] = time.monotonic()
+            processor_name = metadata["processor"]
+            trace_start = self.tracer.now()
+            ctx = TaskContext(file_path, metadata["output_dir"],
+                              should_stop=lambda: self.run_interrupted(run),
+                              on_progress=lambda val, detail: self.report_progress(file_path, val, detail),
+                              checkpoint=self.checkpoints.get(file_path, processor_name),
+                              on_checkpoint=lambda offset, total, state, live: self.checkpoints.save(file_path, processor_name, offset, total, state, live))
+
+            token = run["accounting"] = self.accountant.begin(trace=self.backend == "Threads")
+            try:
+                if self.backend == "Processes":
+                    finished = run_in_process(processor_name, ctx, run)
+                elif self.backend == "Remote":
+                    finished = self.coordinator.run(processor_name, ctx, run)
+                else:
+                    finished = self.profiler.run(processor_name, PROCESSORS[processor_name]().run, ctx)
+            finally:
+                if token is not None:
+                    metadata["accounting"] = self.accountant.end(token, ctx.bytes_read, run.get("child_accounting"))
+                self.tracer.complete(f"process {os.path.basename(file_path)}", trace_start,
+                                     args={"processor": processor_name, "bytes_read": ctx.bytes_read})
+
+            if run["timed_out"]:
+                return # The watchdog has already finalized this task
+            if not finished:
+                if file_path in self.canceled_tasks:
+                    # A cancel can land while the processor is still saving its checkpoint
+                    self.checkpoints.discard(file_path)
+                self.root.after(0, lambda: self.task_interrupted(file_path, run.get("queue_stopped", False)))
+                return
             
             self.root.after(0, lambda: self.finish_task(file_path, "Completed"))
             
-        except Exception:
-            self.root.after(0, lambda: self.finish_task(file_path, "Failed"))
+        except Exception as e:
+            if not run["timed_out"]:
+                self.root.after(0, lambda exc=e: self.handle_failure(file_path, exc))
+
+        finally:
+            self.end_run(run)
+
+    def run_interrupted(self, run):
+        # should_stop for processors; remembers when the cause was Stop Queue
+        if not self.running:
+            run["queue_stopped"] = True
+        return run["timed_out"] or self.is_interrupted(run["path"])
+
+    def task_interrupted(self, file_path, queue_stopped):
+        # A processor returned early. Tasks cut off by Stop Queue become Paused so Start
+        # resumes them from their checkpoint, like the tasks that were still queued.
+        if file_path in self.canceled_tasks:
+            return # finish_task("Canceled") is already scheduled
+        if queue_stopped and file_path not in self.paused_tasks:
+            self.paused_tasks[file_path] = True
+            if self.running:
+                # The queue was restarted before this task wound down, so its resume was missed
+                self.control_task_internal(file_path, "Resume")
+                return
+        self.update_status(file_path, "Paused" if file_path in self.paused_tasks else "Cancelling...")
+
+    def report_progress(self, file_path, value, detail):
+        # Called from the processing thread; progress is traced in 10% steps
+        if value % 10 == 0:
+            self.tracer.instant("progress", args={"file": os.path.basename(file_path), "percent": value})
+        self.root.after(0, lambda: self.update_progress(file_path, value, detail))
+
+    # --- Timeouts ---
+
+    def set_task_timeout(self):
+        selected_paths = self.selected_paths()
+        if not selected_paths:
+            messagebox.showinfo("Selection Error", "Please select one or more tasks.")
+            return
+        seconds = simpledialog.askfloat("Set Timeout", "Timeout in seconds for the selected tasks (0 = priority default):",
+                                        minvalue=0, parent=self.root)
+        if seconds is None:
+            return
+        for file_path in selected_paths:
+            self.task_metadata[file_path]["timeout"] = seconds
+
+    def begin_run(self, file_path, pooled=True):
+        metadata = self.task_metadata.get(file_path, {})
+        timeout = metadata.get("timeout") or self.priority_timeouts.get(metadata.get("priority"), 0)
+        run = {
+            "path": file_path,
+            "deadline": time.monotonic() + timeout if timeout else None,
+            "timed_out": False,
+            "released": False,
+            "process": None,
+            "accounting": None, # ResourceAccountant token, so the watchdog can stop a sample
+            "slots": self.slots if pooled else None, # Released to the same pool even if the backend changes meanwhile
+        }
+        with self.running_lock:
+            self.running_tasks[file_path] = run
+        return run
+
+    def end_run(self, run):
+        # Frees the task's slot exactly once, whether it finished or the watchdog gave up on it
+        with self.running_lock:
+            if run["released"]:
+                return
+            run["released"] = True
+            if self.running_tasks.get(run["path"]) is run:
+                del self.running_tasks[run["path"]]
+        if run["slots"] is not None:
+            run["slots"].release()
+
+    def watchdog_loop(self):
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            now = time.monotonic()
+            with self.running_lock:
+                expired = [run for run in self.running_tasks.values()
+                           if run["deadline"] and now > run["deadline"] and not run["timed_out"]]
+            for run in expired:
+                run["timed_out"] = True # Cooperative cancel for processors polling should_stop
+                if run["process"] is not None:
+                    run["process"].kill()
+                self.accountant.abandon(run["accounting"]) # Stop tracemalloc and free the sample
+                self.end_run(run)       # The slot is free even if the thread stays stuck in I/O
+                self.root.after(0, lambda fp=run["path"]: self.finish_task(fp, "Timed Out"))
+
+    def handle_failure(self, file_path, exc):
+        metadata = self.task_metadata.get(file_path)
+        if metadata is None or file_path in self.canceled_tasks:
+            return
+        attempt = metadata["attempts"] = metadata.get("attempts", 0) + 1
+        try:
+            self.retry_policy.max_retries = int(self.max_retries_var.get())
+        except (tk.TclError, ValueError):
+            pass
+
+        if not self.retry_policy.should_retry(exc, attempt):
+            self.finish_task(file_path, "Failed")
+            return
+
+        delay = self.retry_policy.delay(attempt)
+        self.update_status(file_path, f"Retry {attempt}/{self.retry_policy.max_retries} in {delay:.1f}s")
+        self.retry_queue.schedule(delay, lambda: self.root.after(0, lambda: self.retry_task(file_path)))
+
+    def retry_task(self, file_path):
+        # Cleared, canceled or paused tasks are left alone; Resume/Start re-queues paused ones
+        if file_path not in self.task_rows or file_path in self.canceled_tasks:
+            return
+        if file_path in self.paused_tasks:
+            self.update_status(file_path, "Paused")
+            return
+        self.update_status(file_path, "Queued")
+        self.enqueue_task(file_path)
+
+    # --- Pipeline Mode ---
+
+    def choose_output_dir(self):
+        folder_path = filedialog.askdirectory()
+        if folder_path:
+            self.output_dir.set(folder_path)
+
+    def build_pipeline(self):
+        read_workers, transform_workers, write_workers = (int(n) for n in self.stage_workers.get().split("/"))
+        # Stages pass PIPELINE_CHUNK_SIZE chunks, so the bounded queues also bound the bytes in
+        # flight, and the reads of one file overlap with transforming and writing its earlier chunks
+        stages = [
+            PipelineStage("read", self.pipeline_read, read_workers, fan_out=True),
+            PipelineStage("transform", self.instrumented_stage("transform", self.pipeline_transform), transform_workers),
+            PipelineStage("write", self.instrumented_stage("write", self.pipeline_write), write_workers),
+        ]
+        return Pipeline(stages, on_done=self.pipeline_done, on_error=self.pipeline_failed, on_drop=self.pipeline_drop)
+
+    def instrumented_stage(self, name, func):
+        # Adds each stage's thread CPU time to the file's totals and traces the stage span
+        def run_stage(item):
+            trace_start = self.tracer.now()
+            started = time.thread_time()
+            try:
+                return func(item)
+            finally:
+                self.charge_cpu(item["job"], started)
+                self.tracer.complete(f"{name} {os.path.basename(item['job']['path'])}", trace_start, cat="pipeline")
+        return run_stage
+
+    def charge_cpu(self, job, started):
+        if self.accountant.enabled:
+            with job["lock"]:
+                job["cpu"] += time.thread_time() - started
+
+    def submit_to_pipeline(self, pipeline, file_path):
+        # One job per file; its chunks carry a reference to it through the stages
+        job = {"path": file_path, "lock": threading.Lock(), "state": "active", "run": None, "sink": None,
+               "pending": {}, "next_seq": 0, "cpu": 0.0}
+        item = {"job": job}
+        # Blocks this dispatcher while the read stage is full (backpressure)
+        while self.running:
+            try:
+                pipeline.submit(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        self.pipeline_drop(item)
+
+    def job_stopped(self, job):
+        return job["state"] != "active" or job["run"]["timed_out"] or self.is_interrupted(job["path"])
+
+    def close_job(self, job, state):
+        # Moves a job out of "active" exactly once, discarding its partial output unless it is done
+        with job["lock"]:
+            if job["state"] != "active":
+                return False
+            job["state"] = state
+            job["pending"].clear()
+            if state != "done" and job["sink"] is not None:
+                job["sink"].abort()
+        if job["run"] is not None:
+            self.end_run(job["run"])
+        return True
+
+    def pipeline_done(self, item):
+        job = item["job"]
+        self.end_run(job["run"])
+        if job["run"]["timed_out"]:
+            return # The watchdog has already finalized this task
+        file_path = job["path"]
+        if self.accountant.enabled and file_path in self.task_metadata:
+            self.task_metadata[file_path]["accounting"] = {"cpu": job["cpu"], "bytes_read": job["ctx"].bytes_read, "peak_mem": None}
+        self.root.after(0, lambda: self.finish_task(file_path, "Completed"))
+
+    def pipeline_failed(self, item, exc):
+        job = item["job"]
+        if self.close_job(job, "failed") and not (job["run"] and job["run"]["timed_out"]):
+            self.root.after(0, lambda: self.handle_failure(job["path"], exc))
+
+    def pipeline_drop(self, item):
+        # Jobs interrupted mid-pipeline become Paused so Resume/Start re-queues them
+        job = item["job"]
+        if not self.close_job(job, "dropped"):
+            return
+        file_path = job["path"]
+        if file_path in self.canceled_tasks or (job["run"] and job["run"]["timed_out"]):
+            return
+        self.paused_tasks[file_path] = True
+        self.root.after(0, lambda: self.update_status(file_path, "Paused"))
+
+    def is_interrupted(self, file_path):
+        return not self.running or file_path in self.canceled_tasks or file_path in self.paused_tasks
+
+    def pipeline_read(self, item):
+        # Fan-out stage: opens the task's output and yields the file as numbered chunks
+        job = item["job"]
+        file_path = job["path"]
+        if self.is_interrupted(file_path):
+            self.pipeline_drop(item)
+            return
+        metadata = self.task_metadata[file_path]
+        processor = PROCESSORS[metadata["processor"]]()
+        job["run"] = self.begin_run(file_path, pooled=False) # Timeouts apply as in the other modes
+        metadata["started_at"] = time.monotonic()
+        ctx = TaskContext(file_path, metadata["output_dir"],
+                          should_stop=lambda: self.job_stopped(job),
+                          on_progress=lambda val, detail: self.report_progress(file_path, val, detail))
+        job.update(processor=processor, ctx=ctx, size=os.path.getsize(file_path))
+        self.root.after(0, lambda: self.update_status(file_path, "Processing"))
+
+        trace_start, started = self.tracer.now(), time.thread_time()
+        with ctx.open_source() as f:
+            with job["lock"]:
+                if job["state"] == "active":
+                    job["sink"] = processor.open_sink(ctx)
+            seq, data = 0, f.read(PIPELINE_CHUNK_SIZE)
+            while not ctx.should_stop():
+                # Reading one chunk ahead tells us which chunk is the last (an empty file is one empty chunk)
+                following = f.read(PIPELINE_CHUNK_SIZE)
+                chunk = {"job": job, "seq": seq, "data": data, "end": ctx.bytes_read - len(following), "last": not following}
+                self.charge_cpu(job, started)
+                self.tracer.complete(f"read {os.path.basename(file_path)}", trace_start, cat="pipeline")
+                yield chunk
+                if not following:
+                    return
+                trace_start, started = self.tracer.now(), time.thread_time()
+                seq, data = seq + 1, following
+        self.pipeline_drop(item) # Also discards the partial output of a timed-out job
+
+    def pipeline_transform(self, item):
+        if self.job_stopped(item["job"]):
+            self.pipeline_drop(item)
+            return None
+        item["data"] = item["job"]["processor"].transform_chunk(item["data"])
+        return item
+
+    def pipeline_write(self, item):
+        # Chunks can arrive out of order from parallel transform workers; they wait in the job's
+        # reorder buffer until every earlier chunk has been written
+        job = item["job"]
+        if self.job_stopped(job):
+            self.pipeline_drop(item)
+            return None
+        with job["lock"]:
+            if job["state"] != "active":
+                return None
+            job["pending"][item["seq"]] = item
+            while job["next_seq"] in job["pending"]:
+                ready = job["pending"].pop(job["next_seq"])
+                job["sink"].write(ready.pop("data"))
+                job["next_seq"] += 1
+                job["ctx"].report(ready["end"], job["size"], unit="bytes")
+                if ready["last"]:
+                    job["sink"].finish()
+                    job["state"] = "done"
+                    return ready
+        return None
+
+    # --- Remote Workers ---
+
+    def start_coordinator(self):
+        address = self.coordinator_address.get().strip()
+        if self.coordinator and self.coordinator.address == address:
+            return True # Keep listening across Stop/Start so connected workers stay attached
+        if self.coordinator:
+            self.coordinator.stop()
+            self.coordinator = None
+        coordinator = Coordinator(address)
+        try:
+            coordinator.start()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Cannot listen on {address}: {e}")
+            return False
+        self.coordinator = coordinator
+        self.refresh_remote_status(coordinator)
+        return True
+
+    def refresh_remote_status(self, coordinator):
+        if coordinator is not self.coordinator:
+            return
+        if not self.pipeline:
+            workers, slots, busy = coordinator.status()
+            self.pipeline_status.set(f"Coordinator {coordinator.address} — {workers} worker node(s), {busy}/{slots} slots busy")
+        self.root.after(1000, lambda: self.refresh_remote_status(coordinator))
+
+    def refresh_pipeline_status(self, pipeline):
+        if pipeline is not self.pipeline:
+            return
+        parts = [f"{name} {util:.0%} [{depth}/{size}]" for name, util, depth, size in pipeline.utilization()]
+        self.pipeline_status.set("Pipeline — " + " | ".join(parts))
+        self.root.after(1000, lambda: self.refresh_pipeline_status(pipeline))
 
     def update_status(self, file_path, status):
         row_id = self.task_rows.get(file_path)
@@ -497,7 +3262,7 @@ class TaskManagerApp:
             
             current_tags = list(self.task_table.item(row_id, "tags"))
             # Remove old status tags
-            new_tags = [t for t in current_tags if not t in ('queued', 'processing', 'paused', 'completed', 'failed')]
+            new_tags = [t for t in current_tags if not t in ('queued', 'processing', 'paused', 'completed', 'failed', 'retrying')]
             
             # Add new status tag
             if status == "Queued":
@@ -506,18 +3271,28 @@ class TaskManagerApp:
                 new_tags.append('processing')
             elif status == "Paused":
                 new_tags.append('paused')
+            elif status == "Waiting":
+                new_tags.append('queued')
+            elif status.startswith("Retry"):
+                new_tags.append('retrying')
             
             self.task_table.item(row_id, values=vals, tags=tuple(new_tags))
 
-    def update_progress(self, file_path, value):
+    def update_progress(self, file_path, value, detail=None):
         row_id = self.task_rows.get(file_path)
         if row_id:
             vals = list(self.task_table.item(row_id, "values"))
             vals[6] = f"{value}%" # Progress is at index 6
+            if detail:
+                done, total, unit = detail
+                if unit == "bytes":
+                    vals[6] += f" ({self.format_file_size(done)} / {self.format_file_size(total)})"
+                else:
+                    vals[6] += f" ({done}/{total} {unit})"
             
             current_tags = list(self.task_table.item(row_id, "tags"))
             new_tags = [t for t in current_tags if not t.startswith('progress_')]
-            new_tags.append(self.progress_styles.get(value, 'progress_0'))
+            new_tags.append(self.progress_tag(value))
             
             self.task_table.item(row_id, values=vals, tags=tuple(new_tags))
 
@@ -525,6 +3300,9 @@ class TaskManagerApp:
         # Clean up control flags
         self.paused_tasks.pop(file_path, None)
         self.canceled_tasks.pop(file_path, None)
+        self.checkpoints.discard(file_path)
+        self.tracer.instant("finish", args={"file": os.path.basename(file_path), "status": status})
+        self.release_dependents(file_path, status)
         
         if file_path in self.task_rows:
             row_id = self.task_rows.pop(file_path)
@@ -538,40 +3316,214 @@ class TaskManagerApp:
                 
                 end_time = datetime.now()
                 duration = round((end_time - start_time).total_seconds(), 2)
+
+                # Split the duration into queue wait and processing time
+                finished_at = time.monotonic()
+                enqueued_at, started_at = metadata.get("enqueued_at"), metadata.get("started_at")
+                wait = round(started_at - enqueued_at, 3) if started_at and enqueued_at else None
+                processing = round(finished_at - started_at, 3) if started_at else None
+                self.metrics.record(priority, enqueued_at, started_at, finished_at, metadata.get("size_bytes", 0), status)
+                accounting = metadata.get("accounting") or {}
             else:
+                metadata = {}
                 task_id = 0
                 priority = "N/A"
                 end_time = datetime.now()
                 duration = 0
+                wait = processing = None
+                accounting = {}
                 
-            # Add to history table
-            tag = 'completed' if status == "Completed" else 'failed'
-            self.history_table.insert("", tk.END, values=(task_id, os.path.basename(file_path), priority, end_time.strftime("%Y-%m-%d %H:%M:%S"), duration, status), tags=(tag))
-            self.autofit_columns(self.history_table)
+            # Add to the history store
+            tag = {"Completed": 'completed', "Timed Out": 'timedout'}.get(status, 'failed')
+            self.history.add({
+                "task_id": task_id,
+                "file_path": file_path,
+                "file_name": os.path.basename(file_path),
+                "priority": priority,
+                "priority_value": self.file_queue._get_priority_value(priority),
+                "processor": metadata.get("processor"),
+                "completed_at": end_time.timestamp(),
+                "duration": duration,
+                "wait": wait,
+                "processing": processing,
+                "cpu": round(accounting["cpu"], 4) if "cpu" in accounting else None,
+                "bytes_read": accounting.get("bytes_read"),
+                "peak_mem": accounting.get("peak_mem"),
+                "size": metadata.get("size_bytes"),
+                "status": status,
+            })
+            self.schedule_history_refresh()
             
             # Update the 'Active Task' row before deleting
-            progress_tag = 'progress_100' if status == "Completed" else 'progress_0'
+            progress_tag = self.progress_tag(100 if status == "Completed" else 0)
             
             # Use current_vals[0] (ID), current_vals[1] (File), current_vals[2] (Priority), current_vals[7] (Started At)
             self.task_table.item(row_id, values=(current_vals[0], current_vals[1], current_vals[2], current_vals[3], current_vals[4], status, "100%", current_vals[7]), tags=(tag, progress_tag))
             
             self.root.after(500, lambda: self.task_table.delete(row_id))
 
+    # --- History View ---
+
+    def history_filters(self):
+        status = self.history_status_filter.get()
+        priority = self.history_priority_filter.get()
+        return (None if status == "All" else status), (None if priority == "All" else priority)
+
+    def history_values(self, record):
+        completed = datetime.fromtimestamp(record["completed_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        values = (record["task_id"], record["file_name"], record["priority"], completed, record["duration"], record["wait"],
+                  record["processing"], record["cpu"], record["bytes_read"], record["peak_mem"], record["status"])
+        return tuple("" if v is None else v for v in values)
+
+    def load_history_page(self, page, autofit=False):
+        # Columns are fitted on the first load only; refreshes keep the user's widths and
+        # double-clicking a header refits that column
+        status, priority = self.history_filters()
+        total = self.history.count(status, priority)
+        last_page = max(0, (total - 1) // HISTORY_PAGE_SIZE)
+        self.history_page = min(max(page, 0), last_page)
+        sort_column, descending = self.history_sort
+        records = self.history.page(status, priority, sort_column, descending, offset=self.history_page * HISTORY_PAGE_SIZE)
+
+        self.history_table.delete(*self.history_table.get_children())
+        for record in records:
+            tag = {"Completed": 'completed', "Timed Out": 'timedout'}.get(record["status"], 'failed')
+            self.history_table.insert("", tk.END, values=self.history_values(record), tags=(tag,))
+        if autofit:
+            self.autofit_columns(self.history_table)
+
+        self.history_page_label.set(f"Page {self.history_page + 1}/{last_page + 1} ({total:,} rows)")
+        counts = self.history.counts_by_status()
+        self.history_summary.set("  |  ".join(f"{name}: {count}" for name, count in sorted(counts.items())))
+
+    def schedule_history_refresh(self):
+        # Coalesce bursts of finished tasks into one page reload
+        if not self.history_refresh_pending:
+            self.history_refresh_pending = True
+            self.root.after(250, self.refresh_history)
+
+    def refresh_history(self):
+        self.history_refresh_pending = False
+        self.load_history_page(self.history_page)
+
+    def sort_history(self, col):
+        sort_column, descending = self.history_sort
+        self.history_sort = (col, not descending if col == sort_column else False)
+        self.load_history_page(0)
+
     # --- Utility Functions (autofit, sort, export, exit remain largely the same) ---
 
     def export_history(self):
-        save_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")], title="Save History as CSV")
+        if self.history_export:
+            # A second click while an export runs cancels it
+            self.history_export.cancel()
+            return
+        save_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=HistoryExporter.formats(), title="Export History")
+        if not save_path:
+            return
+        status, priority = self.history_filters()
+        try:
+            self.history_export = HistoryExporter(
+                self.history, save_path, status, priority, self.history_sort,
+                on_progress=lambda done, total: self.root.after(0, self.update_export_progress, done, total),
+                on_done=lambda written, error: self.root.after(0, self.export_finished, save_path, written, error))
+        except ValueError as e:
+            messagebox.showerror("Export Failed", str(e))
+            return
+        self.export_progress["value"] = 0
+        self.export_status.set(f"Exporting {self.history_export.format.upper()}...")
+        self.export_button.config(text="✖ Cancel Export")
+        self.history_export.start()
+
+    def update_export_progress(self, done, total):
+        self.export_progress["value"] = 100 * done / total if total else 100
+        self.export_status.set(f"Exported {done:,}/{total:,} rows")
+
+    def export_finished(self, save_path, written, error):
+        self.history_export = None
+        self.export_button.config(text="💾 Export History")
+        if error is None:
+            self.export_progress["value"] = 100
+            self.export_status.set(f"Exported {written:,} rows")
+            messagebox.showinfo("Export Successful", f"History exported to {save_path}")
+        elif isinstance(error, InterruptedError):
+            self.export_progress["value"] = 0
+            self.export_status.set("Export cancelled")
+        else:
+            self.export_status.set("Export failed")
+            messagebox.showerror("Export Failed", f"Error exporting history: {error}")
+
+    def refresh_metrics(self):
+        files_per_sec, bytes_per_sec = self.metrics.rates()
+        self.throughput_var.set(f"Last {int(MetricsRecorder.RATE_WINDOW)} s: {files_per_sec:.2f} files/s, "
+                                f"{self.format_file_size(bytes_per_sec)}/s  |  Total: {self.format_file_size(self.metrics.bytes_total)}"
+                                f"  |  Accounting overhead: {self.accountant.overhead_per_task() * 1000:.3f} ms/task")
+        for row_id in self.metrics_table.get_children():
+            self.metrics_table.delete(row_id)
+        for priority, count, *latencies in self.metrics.snapshot():
+            self.metrics_table.insert("", tk.END, values=(priority, count, *(f"{v:.3f}s" for v in latencies)))
+        self.root.after(1000, self.refresh_metrics)
+
+    def export_metrics(self):
+        save_path = filedialog.asksaveasfilename(defaultextension=".prom", filetypes=[("Prometheus text", "*.prom"), ("All files", "*.*")], title="Dump Metrics")
+        if save_path:
+            try:
+                with open(save_path, "w", encoding="utf-8") as f:
+                    f.write(self.metrics.to_prometheus())
+            except Exception as e:
+                messagebox.showerror("Export Failed", f"Error writing metrics: {e}")
+
+    def toggle_profiling(self):
+        try:
+            fraction = float(self.profile_fraction.get())
+        except ValueError:
+            messagebox.showerror("Error", "Profile fraction must be a number between 0 and 1.")
+            self.profile_var.set(False)
+            return
+        self.profiler.fraction = min(max(fraction, 0.0), 1.0)
+        self.profiler.enabled = self.profile_var.get()
+
+    def show_profiles(self):
+        processors = self.profiler.processors()
+        if not processors:
+            messagebox.showinfo("Profiles", "No profiled calls yet. Enable profiling and run some tasks.")
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Processor Profiles")
+        window.rowconfigure(1, weight=1)
+        window.columnconfigure(0, weight=1)
+        choice = tk.StringVar(value=processors[0])
+        picker = ttk.Combobox(window, textvariable=choice, values=processors, state="readonly", width=24)
+        picker.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        text = tk.Text(window, wrap="none", font="Courier 9", width=120, height=40)
+        text.grid(row=1, column=0, sticky="nsew")
+        scroll = ttk.Scrollbar(window, orient="vertical", command=text.yview)
+        scroll.grid(row=1, column=1, sticky="ns")
+        text.configure(yscrollcommand=scroll.set)
+
+        def render(_=None):
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, self.profiler.report(choice.get()))
+        picker.bind("<<ComboboxSelected>>", render)
+        render()
+
+    def dump_profiles(self):
+        folder_path = filedialog.askdirectory(title="Folder for .pstats files")
+        if folder_path:
+            try:
+                paths = self.profiler.dump(folder_path)
+                messagebox.showinfo("Profiles Saved", f"Wrote {len(paths)} pstats file(s) to {folder_path}")
+            except Exception as e:
+                messagebox.showerror("Export Failed", f"Error writing profiles: {e}")
+
+    def export_trace(self):
+        save_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json")], title="Export Trace")
         if save_path:
             try:
-                with open(save_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Task ID", "File Name", "Priority", "Completed At", "Duration (s)", "Finish Status"])
-                    for row_id in self.history_table.get_children():
-                        values = self.history_table.item(row_id, "values")
-                        writer.writerow(values)
-                messagebox.showinfo("Export Successful", f"History exported to {save_path}")
+                self.tracer.export(save_path)
+                messagebox.showinfo("Export Successful", f"Trace exported to {save_path}\nOpen it in ui.perfetto.dev or chrome://tracing.")
             except Exception as e:
-                messagebox.showerror("Export Failed", f"Error exporting history: {e}")
+                messagebox.showerror("Export Failed", f"Error exporting trace: {e}")
 
     def on_exit(self):
         if not self.file_queue.empty() or self.running:
@@ -579,7 +3531,15 @@ class TaskManagerApp:
                 return
         
         self.stop_workers()
+        if self.watcher:
+            threading.Thread(target=self.watcher.stop, daemon=True).start() # See toggle_watch
+        if self.coordinator:
+            self.coordinator.stop()
+        # Give running processors a moment to notice the stop and write their checkpoints
+        concurrent.futures.wait(list(self.active_futures), timeout=3)
         self.executor.shutdown(wait=False)
+        shutdown_compression_pool()
+        self.history.close()
 
         for t in self.worker_threads:
             if t.is_alive():
@@ -632,7 +3592,7 @@ class TaskManagerApp:
         else:
             try:
                 # Try to sort numerically (for ID, Progress, Duration)
-                items.sort(key=lambda t: float(t[0].strip('%') if isinstance(t[0], str) and t[0].endswith('%') else t[0]), reverse=reverse)
+                items.sort(key=lambda t: float(t[0].split('%')[0] if isinstance(t[0], str) and '%' in t[0] else t[0]), reverse=reverse)
             except ValueError:
                 # Fallback to string sort
                 items.sort(key=lambda t: t[0], reverse=reverse)
@@ -641,7 +3601,242 @@ class TaskManagerApp:
             tv.move(k, '', index)
         tv.heading(col, command=lambda: self.treeview_sort_column(tv, col, not reverse))
 
+# --- Headless Runner ---
+# Runs the same queue, processors, retries and checkpoints without Tk, for servers and cron.
+# Progress goes to stderr (one rewritten line on a terminal, a line every few seconds
+# otherwise); the final summary goes to stdout.
+class HeadlessRunner:
+    LOG_INTERVAL = 10.0 # Seconds between progress lines when stderr is not a terminal
+
+    def __init__(self, processor="Simulate", output_dir="output", workers=4, backend="Threads", max_retries=3,
+                 quiet=False, stream=None, listen="127.0.0.1:7878", dispatcher="auto"):
+        self.processor = processor
+        self.output_dir = os.path.abspath(output_dir)
+        self.workers = workers
+        self.backend = backend
+        self.quiet = quiet
+        self.stream = stream or sys.stderr
+        if dispatcher == "stealing" or (dispatcher == "auto" and workers >= STEALING_MIN_WORKERS):
+            self.file_queue = WorkStealingQueue(workers)
+        else:
+            self.file_queue = PriorityQueue()
+        self.checkpoints = CheckpointStore()
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        self.retry_queue = DelayQueue()
+        self.metrics = MetricsRecorder()
+        self.stop_event = threading.Event()
+        self.tasks = {}      # file_path -> {"id", "priority", "size", "enqueued_at", "attempts"}
+        self.failures = []   # (file_path, error message)
+        self.outstanding = 0 # Tasks queued, running or waiting to retry
+        self.done = collections.Counter()
+        self.retrying = 0
+        self._cond = threading.Condition()
+        self.coordinator = Coordinator(listen) if backend == "Remote" else None
+
+    def add(self, file_path, priority="Medium"):
+        file_path = os.path.abspath(file_path)
+        if file_path in self.tasks:
+            return False
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        task_id = len(self.tasks) + 1
+        self.tasks[file_path] = {"id": task_id, "priority": priority, "size": size, "enqueued_at": time.monotonic(), "attempts": 0}
+        with self._cond:
+            self.outstanding += 1
+        self.file_queue.put(file_path, priority, task_id)
+        return True
+
+    def add_folder(self, folder, extensions=(), recursive=True, priority="Medium"):
+        added = 0
+        for root, dirs, files in os.walk(folder):
+            if not recursive:
+                dirs.clear()
+            if os.path.abspath(root) == self.output_dir:
+                continue
+            # Never descend into the output directory, as the GUI watcher ignores it
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != self.output_dir]
+            for entry in files:
+                if extensions and os.path.splitext(entry)[1].lstrip('.').lower() not in extensions:
+                    continue
+                added += self.add(os.path.join(root, entry), priority)
+        return added
+
+    def run(self):
+        # Returns the process exit code: 0 all completed, 1 some failed, 130 interrupted
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.coordinator:
+            self.coordinator.start()
+        self.started = time.monotonic()
+        threads = [threading.Thread(target=self.worker_loop, daemon=True, name=f"task-worker-{i}") for i in range(self.workers)]
+        for t in threads:
+            t.start()
+        interrupted = False
+        last_log = 0.0
+        try:
+            with self._cond:
+                while self.outstanding:
+                    self._cond.wait(0.5 if self.stream.isatty() else 1.0)
+                    now = time.monotonic()
+                    if self.outstanding and not self.quiet and (self.stream.isatty() or now - last_log >= self.LOG_INTERVAL):
+                        last_log = now
+                        self.print_progress()
+        except KeyboardInterrupt:
+            # Running processors save checkpoints, so the next run resumes where this one stopped
+            interrupted = True
+            self.stop_event.set()
+        for t in threads:
+            t.join(timeout=5)
+        if self.coordinator:
+            self.coordinator.stop()
+        self.elapsed = time.monotonic() - self.started
+        if not self.quiet:
+            self.print_progress(final=True)
+        self.print_summary(interrupted)
+        if interrupted:
+            return 130
+        return 1 if self.failures else 0
+
+    def worker_loop(self):
+        while not self.stop_event.is_set():
+            # With the Remote backend, take a worker node slot first so tasks wait in priority order
+            if self.coordinator and not self.coordinator.acquire(timeout=0.2):
+                with self._cond:
+                    if not self.outstanding:
+                        return
+                continue
+            try:
+                try:
+                    file_path = self.file_queue.get(timeout=0.2)
+                except queue.Empty:
+                    with self._cond:
+                        if not self.outstanding:
+                            return
+                    continue
+                try:
+                    self.process_file(file_path)
+                finally:
+                    self.file_queue.task_done()
+            finally:
+                if self.coordinator:
+                    self.coordinator.release()
+
+    def process_file(self, file_path):
+        task = self.tasks[file_path]
+        task["attempts"] += 1
+        started = time.monotonic()
+        run = {"timed_out": False}
+        ctx = TaskContext(file_path, self.output_dir, should_stop=self.stop_event.is_set,
+                          on_progress=lambda percent, detail: None,
+                          checkpoint=self.checkpoints.get(file_path, self.processor),
+                          on_checkpoint=lambda offset, total, state, live: self.checkpoints.save(file_path, self.processor, offset, total, state, live))
+        try:
+            if self.backend == "Processes":
+                finished = run_in_process(self.processor, ctx, run)
+            elif self.backend == "Remote":
+                finished = self.coordinator.run(self.processor, ctx, run)
+            else:
+                finished = PROCESSORS[self.processor]().run(ctx)
+        except Exception as e:
+            if not self.stop_event.is_set() and self.retry_policy.should_retry(e, task["attempts"]):
+                with self._cond:
+                    self.retrying += 1
+                self.retry_queue.schedule(self.retry_policy.delay(task["attempts"]), lambda: self.retry(file_path))
+                return
+            self.finish(file_path, "Failed", started, error=f"{type(e).__name__}: {e}")
+            return
+        if not finished:
+            self.finish(file_path, "Canceled", started)
+            return
+        self.checkpoints.discard(file_path)
+        self.finish(file_path, "Completed", started)
+
+    def retry(self, file_path):
+        with self._cond:
+            self.retrying -= 1
+        self.file_queue.put(file_path, self.tasks[file_path]["priority"], self.tasks[file_path]["id"])
+
+    def finish(self, file_path, status, started, error=None):
+        task = self.tasks[file_path]
+        self.metrics.record(task["priority"], task["enqueued_at"], started, time.monotonic(), task["size"], status)
+        with self._cond:
+            self.done[status] += 1
+            if error:
+                self.failures.append((file_path, error))
+            self.outstanding -= 1
+            self._cond.notify_all()
+
+    def print_progress(self, final=False):
+        total = len(self.tasks)
+        finished = sum(self.done.values())
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        line = (f"[{finished:>{len(str(total))}}/{total}] {finished * 100 / total if total else 100:5.1f}%  "
+                f"ok {self.done['Completed']}  failed {self.done['Failed']}  retrying {self.retrying}  |  "
+                f"{self.done['Completed'] / elapsed:.1f} files/s  {format_file_size(self.metrics.bytes_total / elapsed)}/s")
+        if self.stream.isatty():
+            self.stream.write("\r" + line.ljust(100) + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def print_summary(self, interrupted):
+        elapsed = max(self.elapsed, 1e-9)
+        print(f"{'Interrupted' if interrupted else 'Finished'}: {sum(self.done.values())}/{len(self.tasks)} files in {elapsed:.2f} s "
+              f"({', '.join(f'{status} {count}' for status, count in sorted(self.done.items())) or 'nothing processed'})")
+        print(f"Throughput: {self.done['Completed'] / elapsed:.2f} files/s, {format_file_size(self.metrics.bytes_total / elapsed)}/s "
+              f"({format_file_size(self.metrics.bytes_total)} total)")
+        for priority, count, w50, w90, w99, p50, p90, p99, pmax in self.metrics.snapshot():
+            if count:
+                print(f"  {priority:<6} {count:>7} tasks  wait p50/p99 {w50:.3f}/{w99:.3f} s  processing p50/p90/p99/max "
+                      f"{p50:.3f}/{p90:.3f}/{p99:.3f}/{pmax:.3f} s")
+        for file_path, error in self.failures:
+            print(f"FAILED {file_path}: {error}", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process files through the task queue without a GUI.")
+    parser.add_argument("paths", nargs="*", help="Folders (and/or individual files) to process")
+    parser.add_argument("-f", "--filter", default="", help="Comma-separated extensions to include, e.g. txt,csv")
+    parser.add_argument("--no-recursive", action="store_true", help="Only take files directly inside each folder")
+    parser.add_argument("-p", "--priority", choices=["High", "Medium", "Low"], default="Medium")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--processor", choices=list(PROCESSORS), default="Checksum (SHA-256)")
+    parser.add_argument("-o", "--output", default="output", help="Output folder for processors that write files")
+    parser.add_argument("--backend", choices=["Threads", "Processes", "Remote"], default="Threads",
+                        help="Remote: serve tasks to worker nodes connecting to --listen")
+    parser.add_argument("--listen", default="127.0.0.1:7878", help="Coordinator address for --backend Remote (host:port or unix:/path)")
+    parser.add_argument("--worker", metavar="ADDRESS", help="Run as a worker node for the coordinator at ADDRESS")
+    parser.add_argument("--slots", type=int, help="Tasks a worker node runs at once (default: CPU count)")
+    parser.add_argument("--name", help="Worker node name shown by the coordinator")
+    parser.add_argument("--retries", type=int, default=3, help="Retries for transient errors")
+    parser.add_argument("--dispatcher", choices=["auto", "shared", "stealing"], default="auto",
+                        help=f"shared: one priority queue; stealing: per-worker deques (auto: from {STEALING_MIN_WORKERS} workers)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress line, summary only")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        try:
+            WorkerNode(args.worker, args.slots, args.name).run_forever()
+        except KeyboardInterrupt:
+            return 130
+    if not args.paths:
+        parser.error("at least one folder or file is required (or --worker ADDRESS)")
+    runner = HeadlessRunner(args.processor, args.output, max(1, args.workers), args.backend, args.retries, args.quiet,
+                            listen=args.listen, dispatcher=args.dispatcher)
+    extensions = [ext.strip().lower() for ext in args.filter.split(',') if ext.strip()]
+    for path in args.paths:
+        if os.path.isdir(path):
+            runner.add_folder(path, extensions, not args.no_recursive, args.priority)
+        elif os.path.isfile(path):
+            runner.add(path, args.priority)
+        else:
+            parser.error(f"no such file or folder: {path}")
+    return runner.run()
+
 if __name__ == "__main__":
+    # Any arguments (or no Tk available) select the command-line runner
+    if len(sys.argv) > 1 or tk is None:
+        sys.exit(main())
     root = tk.Tk()
     app = TaskManagerApp(root, num_workers=4)
     root.mainloop()
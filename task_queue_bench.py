@@ -0,0 +1,401 @@
+# Benchmarks for the task queue engine (task_queue.py), without Tk.
+#
+#   python task_queue_bench.py run -o results.json                 # default matrix
+#   python task_queue_bench.py run --trees tiny --workers 1,4,16 --backends Threads,Processes
+#   python task_queue_bench.py compare before.json after.json      # exit 1 on regressions
+#
+# Synthetic file trees are generated once from a fixed seed into --data-dir and reused.
+# Every end-to-end configuration runs in a fresh interpreter so its peak RSS is its own.
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import contextlib
+import io
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_import_started = time.perf_counter()
+import task_queue
+TASK_QUEUE_IMPORT_S = time.perf_counter() - _import_started
+
+BENCH_SEED = 1234
+# name -> (file count, min size, max size); sizes are drawn log-uniformly
+TREES = {
+    "tiny": (5000, 256, 4 * 1024),
+    "huge": (4, 64 * 1024 * 1024, 64 * 1024 * 1024),
+    "mixed": (500, 1024, 8 * 1024 * 1024),
+}
+FILES_PER_DIR = 200
+# Metrics where a bigger number is better; everything else is "lower is better"
+HIGHER_IS_BETTER = {"enqueue_per_sec", "dequeue_per_sec", "files_per_sec", "bytes_per_sec", "gets_per_sec",
+                    "high_first_fraction"}
+DISPATCHERS = {
+    "shared": lambda workers: task_queue.PriorityQueue(),
+    "stealing": lambda workers: task_queue.WorkStealingQueue(workers),
+}
+
+# --- Synthetic Trees ---
+
+def tree_path(data_dir, name, scale):
+    return os.path.join(data_dir, f"{name}-x{scale:g}")
+
+def generate_tree(data_dir, name, scale=1.0):
+    # Deterministic for a given (name, scale); a manifest marks a finished tree
+    path = tree_path(data_dir, name, scale)
+    manifest = os.path.join(path, "manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest, "r", encoding="utf-8") as f:
+            return path, json.load(f)
+    count, min_size, max_size = TREES[name]
+    if name == "huge":
+        min_size = max_size = max(1024 * 1024, int(max_size * scale))
+    else:
+        count = max(1, int(count * scale))
+    rng = random.Random(f"{BENCH_SEED}-{name}")
+    block = rng.randbytes(1024 * 1024) # Content is repeated slices of one random block
+    total = 0
+    for i in range(count):
+        size = int(min_size * (max_size / min_size) ** rng.random())
+        folder = os.path.join(path, f"d{i // FILES_PER_DIR:04d}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"f{i:06d}.bin"), "wb") as f:
+            remaining = size
+            while remaining:
+                start = rng.randrange(len(block))
+                chunk = block[start:start + remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+        total += size
+    info = {"files": count, "bytes": total}
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    return path, info
+
+# --- Micro Benchmarks ---
+
+def bench_enqueue(n=200_000):
+    # PriorityQueue.put throughput with mixed priorities, then drain rate
+    pq = task_queue.PriorityQueue()
+    priorities = ("High", "Medium", "Low")
+    paths = [f"/bench/file{i}" for i in range(n)]
+    t0 = time.perf_counter()
+    for i, path in enumerate(paths):
+        pq.put(path, priorities[i % 3], i)
+    enqueue = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    while not pq.empty():
+        pq.get()
+    dequeue = time.perf_counter() - t0
+    return {"enqueue_per_sec": n / enqueue, "dequeue_per_sec": n / dequeue}
+
+def bench_dispatch(workers, n=2000):
+    # Latency from put() to an idle worker returning from get(), one task at a time
+    pq = task_queue.PriorityQueue()
+    latencies = []
+    put_times = {}
+    done = threading.Semaphore(0)
+
+    def worker():
+        while True:
+            path = pq.get()
+            if path is None:
+                return
+            latencies.append(time.perf_counter() - put_times[path])
+            pq.task_done()
+            done.release()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05) # Let every worker block in get()
+    for i in range(n):
+        path = f"/bench/dispatch{i}"
+        put_times[path] = time.perf_counter()
+        pq.put(path, "Medium", i)
+        done.acquire()
+    for i in range(workers):
+        pq._queue.put((99, 0, n + i, None)) # None sentinels stop the workers
+    histogram = task_queue.LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    return {"dispatch_p50_us": histogram.percentile(50) * 1e6, "dispatch_p99_us": histogram.percentile(99) * 1e6}
+
+def bench_contention(dispatcher, workers, n=100_000, work_iterations=50):
+    # Many workers draining one backlog: gets/sec, plus how well priority order survives
+    # (share of High entries among the first third dequeued; 1.0 is perfect order)
+    pq = DISPATCHERS[dispatcher](workers)
+    priorities = ("High", "Medium", "Low")
+    for i in range(n):
+        pq.put(f"/bench/contention{i}", priorities[i % 3], i)
+    order = []
+    start = threading.Barrier(workers + 1)
+
+    def worker():
+        start.wait()
+        while True:
+            try:
+                path = pq.get(timeout=0.05)
+            except task_queue.queue.Empty:
+                return
+            order.append(path)
+            for _ in range(work_iterations): # A sliver of per-task work between gets
+                pass
+            pq.task_done()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0 - 0.05 # Each worker's final get waits out its timeout
+    if len(order) != n or len(set(order)) != n:
+        raise RuntimeError(f"{dispatcher} dispatcher lost or duplicated entries ({len(order)} of {n})")
+    first_third = order[:n // 3]
+    high = sum(1 for path in first_third if int(path.rsplit("contention", 1)[1]) % 3 == 0)
+    return {"gets_per_sec": n / elapsed, "high_first_fraction": high / len(first_third)}
+
+# --- GUI Startup ---
+
+def measure_startup():
+    # Runs in a fresh interpreter (see bench_startup): module import time plus TaskManagerApp's
+    # window-ready time. Returns {"skipped": reason} without Tk or a display.
+    tk = task_queue.tk
+    if tk is None:
+        return {"skipped": "tkinter is not installed"}
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": f"no display ({e})"}
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir) # History database and checkpoints stay out of the caller's folder
+        app = task_queue.TaskManagerApp(root)
+        while app.startup_seconds is None:
+            root.update()
+        result = {"import_s": TASK_QUEUE_IMPORT_S, "startup_s": app.startup_seconds,
+                  "progress_styles_created": len(app.progress_styles)}
+        app.history.close()
+        root.destroy()
+    return result
+
+def bench_startup(repeat=5):
+    # Best of N fresh processes
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "_startup"], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        if completed.returncode != 0:
+            raise RuntimeError(f"startup benchmark failed: {completed.stderr.strip()}")
+        measured = json.loads(completed.stdout)
+        if "skipped" in measured:
+            return measured
+        if best is None or measured["startup_s"] < best["startup_s"]:
+            best = measured
+    return best
+
+# --- End-to-End Runs ---
+
+def peak_rss_bytes(children=False):
+    # VmHWM belongs to this process image; ru_maxrss on Linux also carries over the high-water
+    # mark of the parent that forked us, which would hide the benchmark's own peak
+    peak = None
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource:
+        scale = 1 if sys.platform == "darwin" else 1024 # ru_maxrss is KB on Linux, bytes on macOS
+        if peak is None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        if children:
+            # Largest single worker process (these are spawned, so they start small)
+            peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+    return peak
+
+def run_single(config):
+    # Runs one configuration in this process and returns its measurements
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir) # Checkpoint and output files stay out of the caller's folder
+        runner = task_queue.HeadlessRunner(config["processor"], os.path.join(work_dir, "out"), config["workers"],
+                                           config["backend"], quiet=True)
+        t0 = time.perf_counter()
+        runner.add_folder(config["tree_path"])
+        enqueue_time = time.perf_counter() - t0
+        with contextlib.redirect_stdout(io.StringIO()):
+            exit_code = runner.run()
+        elapsed = runner.elapsed
+        wait = runner.metrics.wait["Medium"]
+        peak_rss = peak_rss_bytes(children=config["backend"] == "Processes")
+        return {
+            "files": len(runner.tasks),
+            "bytes": runner.metrics.bytes_total,
+            "failed": runner.done["Failed"],
+            "exit_code": exit_code,
+            "add_folder_s": enqueue_time,
+            "elapsed_s": elapsed,
+            "files_per_sec": runner.done["Completed"] / elapsed if elapsed else 0.0,
+            "bytes_per_sec": runner.metrics.bytes_total / elapsed if elapsed else 0.0,
+            "queue_wait_p50_s": wait.percentile(50),
+            "queue_wait_p99_s": wait.percentile(99),
+            "peak_rss_bytes": peak_rss,
+        }
+
+def run_isolated(config):
+    # Fresh interpreter per configuration: peak RSS and warm caches do not leak between runs
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "_single", json.dumps(config)],
+                               capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise RuntimeError(f"benchmark run failed for {config}: {completed.stderr.strip()}")
+    return json.loads(completed.stdout)
+
+def metadata():
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        meta["git_commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        meta["git_commit"] = None
+    return meta
+
+def result_key(result):
+    # Identifies the same measurement across two result files
+    return "/".join(str(result[k]) for k in ("bench", "dispatcher", "tree", "backend", "workers", "processor") if k in result)
+
+def cmd_run(args):
+    workers = [int(w) for w in args.workers.split(",")]
+    backends = args.backends.split(",")
+    results = []
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+
+    startup = bench_startup(args.repeat)
+    if "skipped" in startup:
+        log(f"startup: skipped, {startup['skipped']}")
+    else:
+        results.append(dict(bench="startup", **startup))
+        log(f"startup: window ready in {startup['startup_s'] * 1000:.0f} ms (import {startup['import_s'] * 1000:.0f} ms)")
+
+    micro = dict(bench="enqueue", **bench_enqueue())
+    results.append(micro)
+    log(f"enqueue: {micro['enqueue_per_sec']:,.0f}/s, dequeue: {micro['dequeue_per_sec']:,.0f}/s")
+    for count in workers:
+        dispatch = dict(bench="dispatch", workers=count, **bench_dispatch(count))
+        results.append(dispatch)
+        log(f"dispatch, {count} workers: p50 {dispatch['dispatch_p50_us']:.0f} µs, p99 {dispatch['dispatch_p99_us']:.0f} µs")
+
+    for count in (int(w) for w in args.contention_workers.split(",")):
+        for dispatcher in DISPATCHERS:
+            contention = dict(bench="contention", dispatcher=dispatcher, workers=count, **bench_contention(dispatcher, count))
+            results.append(contention)
+            log(f"contention, {dispatcher:<8} {count:>3} workers: {contention['gets_per_sec']:,.0f} gets/s, "
+                f"High share of first third {contention['high_first_fraction']:.2f}")
+
+    for tree in args.trees.split(","):
+        path, info = generate_tree(args.data_dir, tree, args.scale)
+        log(f"tree {tree}: {info['files']} files, {task_queue.format_file_size(info['bytes'])}")
+        for backend in backends:
+            for count in workers:
+                config = {"tree_path": path, "processor": args.processor, "workers": count, "backend": backend}
+                best = None
+                for _ in range(args.repeat):
+                    measured = run_isolated(config)
+                    if best is None or measured["elapsed_s"] < best["elapsed_s"]:
+                        best = measured # Best of N: least disturbed by other load on the machine
+                result = dict(bench="end_to_end", tree=tree, backend=backend, workers=count, processor=args.processor, **best)
+                results.append(result)
+                rss = task_queue.format_file_size(result["peak_rss_bytes"]) if result["peak_rss_bytes"] else "n/a"
+                log(f"  {backend:<9} {count:>3} workers: {result['files_per_sec']:9.1f} files/s  "
+                    f"{task_queue.format_file_size(result['bytes_per_sec'])}/s  peak RSS {rss}")
+
+    output = {"meta": dict(metadata(), scale=args.scale, repeat=args.repeat), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        log(f"results written to {args.output}")
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    return 0
+
+def cmd_compare(args):
+    with open(args.before, "r", encoding="utf-8") as f:
+        before = {result_key(r): r for r in json.load(f)["results"]}
+    with open(args.after, "r", encoding="utf-8") as f:
+        after = {result_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"{'benchmark':<48} {'metric':<18} {'before':>14} {'after':>14} {'change':>9}")
+    for key in sorted(before.keys() & after.keys()):
+        for metric, old in before[key].items():
+            new = after[key].get(metric)
+            if metric in ("files", "bytes", "failed", "exit_code", "workers", "progress_styles_created") or not isinstance(old, (int, float)) \
+                    or not isinstance(new, (int, float)) or isinstance(old, bool) or not old:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif worse < -args.threshold:
+                flag = "  improved"
+            print(f"{key:<48} {metric:<18} {old:>14.4g} {new:>14.4g} {change:>+8.1f}%{flag}")
+    for key in sorted(before.keys() ^ after.keys()):
+        print(f"{key:<48} only in {'before' if key in before else 'after'}")
+    print(f"{regressions} regression(s) beyond {args.threshold:g}%")
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the task queue engine.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark matrix and write JSON results")
+    run.add_argument("--trees", default="tiny,huge,mixed", help=f"Comma-separated trees from {', '.join(TREES)}")
+    run.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    run.add_argument("--contention-workers", default="1,8,32,64", help="Worker counts for the dispatcher contention benchmark")
+    run.add_argument("--backends", default="Threads",
+                     help="Comma-separated backends (Threads,Processes); Processes spawns one interpreter per file")
+    run.add_argument("--processor", default="Checksum (SHA-256)", choices=list(task_queue.PROCESSORS))
+    run.add_argument("--scale", type=float, default=1.0, help="Multiplies file counts (tiny/mixed) or file sizes (huge)")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per configuration; the fastest is kept")
+    run.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "task_queue_bench"))
+    run.add_argument("-o", "--output", help="JSON results file (default: stdout)")
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--threshold", type=float, default=5.0, help="Percent change reported as a regression")
+
+    single = commands.add_parser("_single") # Internal: one isolated end-to-end run
+    single.add_argument("config")
+    commands.add_parser("_startup") # Internal: one isolated GUI startup measurement
+
+    args = parser.parse_args(argv)
+    if args.command == "_single":
+        json.dump(run_single(json.loads(args.config)), sys.stdout)
+        return 0
+    if args.command == "_startup":
+        json.dump(measure_startup(), sys.stdout)
+        return 0
+    return cmd_run(args) if args.command == "run" else cmd_compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())